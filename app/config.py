@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 from pydantic import EmailStr, field_validator
 import json
 
@@ -9,12 +9,53 @@ class Settings(BaseSettings):
     
     # Scraper ayarları
     SCRAPE_INTERVAL_MINUTES: int = 180
+    # Tarama worker'ı (python -m app.worker): görev lease süresi, heartbeat, boşta bekleme, deneme hakkı
+    SCRAPE_LEASE_SECONDS: int = 300
+    SCRAPE_HEARTBEAT_SECONDS: int = 30
+    SCRAPE_WORKER_POLL_SECONDS: int = 5
+    SCRAPE_TASK_MAX_ATTEMPTS: int = 3
+    # API tarafı: iş ilerlemesi (SSE) ve worker'ların eklediği ihaleler için yoklama aralığı
+    SCRAPE_JOB_POLL_SECONDS: float = 1.0
+    CHANGE_WATCH_POLL_SECONDS: float = 2.0
+    
+    # Sorgu önbelleği ayarları
+    QUERY_CACHE_MAX_ENTRIES: int = 256
+    QUERY_CACHE_TTL_SECONDS: int = 300
+    
+    # Facet bitmap index bellek bütçesi (bayt)
+    FACET_INDEX_MAX_BYTES: int = 64 * 1024 * 1024
+    
+    # Canlı ihale akışı (SSE): istemci başına tampon ve heartbeat aralığı
+    STREAM_BUFFER_SIZE: int = 100
+    STREAM_HEARTBEAT_SECONDS: int = 15
     
     # Email ayarları
     SMTP_SERVER: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
     SMTP_USERNAME: str = "infrasis.otomasyon@gmail.com"
     SMTP_PASSWORD: str
+    SMTP_USE_TLS: bool = True
+    # Tekrar kullanılan SMTP bağlantı havuzu
+    SMTP_POOL_SIZE: int = 3
+    SMTP_POOL_MAX_IDLE_SECONDS: int = 60
+    SMTP_TIMEOUT_SECONDS: int = 30
+    # Outbox worker: dakikada en fazla gönderim, bağlantı başına mesaj, tekrar deneme
+    OUTBOX_RATE_PER_MINUTE: int = 20
+    OUTBOX_BATCH_SIZE: int = 10
+    OUTBOX_MAX_ATTEMPTS: int = 6
+    OUTBOX_RETRY_BASE_SECONDS: int = 30
+    OUTBOX_POLL_SECONDS: int = 5
+    OUTBOX_LEASE_SECONDS: int = 600
+    # Toplu özet mailinde tek zarftaki (RCPT TO) en fazla alıcı
+    MAIL_MAX_RCPT_PER_ENVELOPE: int = 50
+    # Mail şablonları: derlenmiş bytecode dizini (boşsa sistem temp dizini), dosya değişikliği takibi
+    MAIL_TEMPLATE_CACHE_DIR: Optional[str] = None
+    MAIL_TEMPLATE_AUTO_RELOAD: bool = False
+    # Zamanlanmış mailler: saat dilimi ve kaçırılan slotun en geç gönderilebileceği süre
+    MAIL_SCHEDULE_TIMEZONE: str = "Europe/Istanbul"
+    MAIL_SCHEDULE_MISFIRE_SECONDS: int = 300
+    # Tarama sonrası bildirim mailinde listelenecek en fazla ihale
+    NOTIFY_MAX_TENDERS: int = 200
     DEFAULT_SENDER: EmailStr = "infrasis.otomasyon@gmail.com"
     NOTIFICATION_RECIPIENTS: List[EmailStr] = ["infrasis.otomasyon@gmail.com"]
     ERROR_NOTIFICATION_RECIPIENTS: List[EmailStr] = ["infrasis.otomasyon@gmail.com"]
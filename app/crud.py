@@ -1,10 +1,18 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, and_, or_, desc
-from datetime import datetime
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, func, and_, or_, desc, bindparam, update, delete, literal, null, union_all, String
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
 import hashlib
+import json
+import time
 from . import models
 from .models import User
+from .schemas import TENDER_FIELDS, TenderOut
 from .utils import get_password_hash
+from .services.facet_index import facet_index
+from .services.broker import tender_broker
+from .services.percolator import saved_search_index
 
 
 def ensure_source(db: Session, name: str, url: str, slug: str) -> models.Source:
@@ -47,46 +55,502 @@ def create_tender_if_new(
 		unique_hash=unique_hash,
 	)
 	db.add(tender)
+	db.flush()
+	update_tender_stats(db, tender.source_id, tender.category, tender.published_at, 1)
+	change = record_tender_change(db, tender.id, "insert")
+	record_saved_search_matches(db, tender, source.slug)
 	db.commit()
 	db.refresh(tender)
+	facet_index.add(tender.id, tender.source_id, tender.category, tender.published_at)
+	if tender_broker.has_subscribers:
+		tender_broker.publish("tender", TenderOut.model_validate(tender).model_dump(mode="json"), seq=change.seq)
 	return tender
 
 
-def filter_tenders(
-	db: Session,
+def _stat_keys(source_id: int, category: str | None, published_at: datetime | None) -> list[tuple[str, str]]:
+	keys = [("total", ""), ("source", str(source_id)), ("category", category or "")]
+	if published_at:
+		keys.append(("day", published_at.date().isoformat()))
+	return keys
+
+
+def _bump_stat(db: Session, dimension: str, key: str, delta: int):
+	stat = models.TenderStat
+	updated = db.execute(
+		update(stat)
+		.where(stat.dimension == dimension, stat.key == key)
+		.values(count=stat.count + delta)
+	).rowcount
+	if not updated:
+		db.add(stat(dimension=dimension, key=key, count=delta))
+		# autoflush kapalı; aynı anahtar bu transaction'da tekrar artırılırsa UPDATE görebilsin
+		db.flush()
+
+
+def update_tender_stats(db: Session, source_id: int, category: str | None, published_at: datetime | None, delta: int):
+	"""tender_stats sayaçlarını çağıranın transaction'ı içinde günceller (commit etmez)"""
+	for dimension, key in _stat_keys(source_id, category, published_at):
+		_bump_stat(db, dimension, key, delta)
+
+
+def set_tender_category(db: Session, tender: models.Tender, category: str | None) -> bool:
+	"""Kategoriyi değiştirir ve kategori sayaçlarını aynı transaction'da günceller (commit etmez)"""
+	if tender.category == category:
+		return False
+	_bump_stat(db, "category", tender.category or "", -1)
+	_bump_stat(db, "category", category or "", 1)
+	facet_index.set_category(tender.id, tender.category, category)
+	tender.category = category
+	record_tender_change(db, tender.id, "update")
+	# Kategori filtreli kayıtlı aramalar ancak kategori atanınca eşleşebilir
+	record_saved_search_matches(db, tender, tender.source.slug if tender.source else None)
+	return True
+
+
+def record_tender_change(db: Session, tender_id: int, op: str):
+	"""Değişiklik akışına satır ekler; çağıranın transaction'ı ile birlikte commit edilir"""
+	change = models.TenderChange(tender_id=tender_id, op=op)
+	db.add(change)
+	return change
+
+
+def record_saved_search_matches(db: Session, tender: models.Tender, source_slug: str | None) -> list[int]:
+	"""İhaleyi tüm kayıtlı aramalarla tek geçişte eşleştirir, eşleşmeleri aynı transaction'a ekler"""
+	search_ids = saved_search_index.match(db, tender.title, tender.description, source_slug, tender.category)
+	if not search_ids:
+		return []
+	existing = set(db.execute(
+		select(models.SavedSearchMatch.saved_search_id).where(models.SavedSearchMatch.tender_id == tender.id)
+	).scalars())
+	new_ids = [search_id for search_id in search_ids if search_id not in existing]
+	db.add_all(models.SavedSearchMatch(saved_search_id=search_id, tender_id=tender.id) for search_id in new_ids)
+	return new_ids
+
+
+def stream_tender_changes(db: Session, since: int, limit: int | None = None, yield_per: int = 500):
+	"""since'ten sonraki değişiklikleri seq sırasıyla, ihalenin güncel haliyle okur"""
+	change = models.TenderChange
+	tender = models.Tender
+	stmt = (
+		select(
+			change.seq,
+			change.op,
+			change.changed_at,
+			tender.id,
+			tender.title,
+			tender.url,
+			tender.description,
+			tender.category,
+			tender.published_at,
+			models.Source.slug,
+		)
+		.join(tender, change.tender_id == tender.id)
+		.outerjoin(models.Source, tender.source_id == models.Source.id)
+		.where(change.seq > since)
+		.order_by(change.seq)
+	)
+	if limit is not None:
+		stmt = stmt.limit(limit)
+	return db.execute(stmt.execution_options(stream_results=True, yield_per=yield_per))
+
+
+def max_change_seq(db: Session) -> int:
+	return db.execute(select(func.coalesce(func.max(models.TenderChange.seq), 0))).scalar_one()
+
+
+def get_tender_changes(db: Session, since: int, limit: int) -> list[tuple[int, str, models.Tender]]:
+	"""since'ten sonraki değişiklikler, ihalenin güncel hali ve kaynağıyla (seq sırasıyla)"""
+	rows = db.execute(
+		select(models.TenderChange.seq, models.TenderChange.op, models.Tender)
+		.join(models.Tender, models.TenderChange.tender_id == models.Tender.id)
+		.options(joinedload(models.Tender.source))
+		.where(models.TenderChange.seq > since)
+		.order_by(models.TenderChange.seq)
+		.limit(limit)
+	).all()
+	return [tuple(row) for row in rows]
+
+
+def rebuild_tender_stats(db):
+	"""tender_stats'ı tenders tablosundan baştan hesaplar (Session veya Connection)"""
+	tender = models.Tender
+	day = func.substr(tender.published_at, 1, 10, type_=String)
+	groups = [
+		("total", select(literal(""), func.count())),
+		("source", select(tender.source_id, func.count()).group_by(tender.source_id)),
+		("category", select(func.coalesce(tender.category, ""), func.count()).group_by(func.coalesce(tender.category, ""))),
+		("day", select(day, func.count()).where(tender.published_at.isnot(None)).group_by(day)),
+	]
+	rows = []
+	for dimension, stmt in groups:
+		for key, count in db.execute(stmt.select_from(tender)):
+			rows.append({"dimension": dimension, "key": str(key), "count": count})
+	db.execute(delete(models.TenderStat))
+	if rows:
+		db.execute(models.TenderStat.__table__.insert(), rows)
+
+
+def get_tender_stats(db: Session, days: int) -> dict:
+	"""Dashboard sayılarını tender_stats'tan okur; maliyet ihale sayısından bağımsızdır.
+
+	by_day bugün dahil son days takvim gününü kapsar; ihale olmayan günler atlanır.
+	"""
+	stat = models.TenderStat
+	rows = db.execute(
+		select(stat.dimension, stat.key, stat.count)
+		.where(stat.dimension.in_(("total", "source", "category")), stat.count > 0)
+	).all()
+	day_rows = db.execute(
+		select(stat.key, stat.count)
+		.where(
+			stat.dimension == "day",
+			stat.count > 0,
+			# Anahtarlar ISO tarih; metin karşılaştırması takvim sırasıyla aynıdır
+			stat.key >= (date.today() - timedelta(days=days - 1)).isoformat(),
+		)
+		.order_by(desc(stat.key))
+	).all()
+	sources = {str(s.id): s for s in db.execute(select(models.Source)).scalars()}
+
+	result = {"total": 0, "by_source": [], "by_category": [], "by_day": []}
+	for dimension, key, count in rows:
+		if dimension == "total":
+			result["total"] = count
+		elif dimension == "source":
+			source = sources.get(key)
+			result["by_source"].append({
+				"source_id": int(key),
+				"slug": source.slug if source else None,
+				"name": source.name if source else None,
+				"count": count,
+			})
+		else:
+			result["by_category"].append({"category": key or None, "count": count})
+	result["by_source"].sort(key=lambda r: -r["count"])
+	result["by_category"].sort(key=lambda r: -r["count"])
+	result["by_day"] = [{"day": key, "count": count} for key, count in reversed(day_rows)]
+	return result
+
+
+class FilterShape(NamedTuple):
+	"""Hangi filtrelerin uygulandığı; aynı şekildeki sorgular aynı ifadeyi paylaşır"""
+	query: bool
+	source: bool
+	date_from: bool
+	date_to: bool
+	category: bool
+
+
+# Filtre şekli başına bir kez kurulan, bind parametreli ifadeler ve şekil bazında süreler
+_statement_cache: dict[tuple, object] = {}
+_shape_stats: dict[str, dict] = {}
+
+
+def _filter_shape(
 	query: str | None,
 	source_slug: str | None,
 	date_from: datetime | None,
 	date_to: datetime | None,
-	limit: int,
-	offset: int,
-):
-	from sqlalchemy.orm import joinedload
-	stmt = select(models.Tender).options(joinedload(models.Tender.source))
+	category: str | None,
+) -> FilterShape:
+	return FilterShape(bool(query), bool(source_slug), bool(date_from), bool(date_to), bool(category))
+
+
+def _filter_params(
+	query: str | None,
+	source_slug: str | None,
+	date_from: datetime | None,
+	date_to: datetime | None,
+	category: str | None,
+) -> dict:
+	params = {}
+	if query:
+		params["q"] = f"%{query.lower()}%"
+	if source_slug:
+		params["source_slug"] = source_slug
+	if date_from:
+		params["date_from"] = date_from
+	if date_to:
+		params["date_to"] = date_to
+	if category:
+		params["category"] = category
+	return params
+
+
+def _tender_conditions(shape: FilterShape) -> list:
 	conditions = []
 	
-	if query:
-		q = f"%{query.lower()}%"
+	if shape.query:
+		q = bindparam("q")
 		conditions.append(or_(
 			func.lower(models.Tender.title).like(q),
 			func.lower(models.Tender.description).like(q),
 		))
 	
-	if source_slug:
-		stmt = stmt.join(models.Source)
-		conditions.append(models.Source.slug == source_slug)
+	if shape.source:
+		conditions.append(models.Source.slug == bindparam("source_slug"))
 	
-	if date_from:
-		conditions.append(models.Tender.published_at >= date_from)
-	if date_to:
-		conditions.append(models.Tender.published_at <= date_to)
+	if shape.date_from:
+		conditions.append(models.Tender.published_at >= bindparam("date_from"))
+	if shape.date_to:
+		conditions.append(models.Tender.published_at <= bindparam("date_to"))
 	
-	if conditions:
-		stmt = stmt.where(and_(*conditions))
+	if shape.category:
+		conditions.append(models.Tender.category == bindparam("category"))
 	
-	stmt = stmt.order_by(desc(models.Tender.published_at), desc(models.Tender.id)).limit(limit).offset(offset)
-	results = db.execute(stmt).scalars().all()
-	return results
+	return conditions
+
+
+def _execute_shape(db: Session, key: tuple, build, params: dict):
+	"""Şekle ait ifadeyi önbellekten alır (yoksa kurar) ve bind parametreleriyle çalıştırır"""
+	started = time.perf_counter()
+	stmt = _statement_cache.get(key)
+	built = stmt is None
+	if built:
+		stmt = build()
+		_statement_cache[key] = stmt
+	prepared = time.perf_counter()
+	result = db.execute(stmt, params)
+	finished = time.perf_counter()
+
+	name = _shape_name(key)
+	stats = _shape_stats.setdefault(name, {"calls": 0, "build_ms": 0.0, "prepare_ms": 0.0, "execute_ms": 0.0})
+	stats["calls"] += 1
+	if built:
+		stats["build_ms"] += (prepared - started) * 1000
+	else:
+		stats["prepare_ms"] += (prepared - started) * 1000
+	stats["execute_ms"] += (finished - prepared) * 1000
+	return result
+
+
+def _shape_name(key: tuple) -> str:
+	kind, shape, *variant = key
+	filters = "+".join(name for name, on in zip(FilterShape._fields, shape) if on) or "none"
+	parts = [
+		("*" if v == TENDER_FIELDS else ",".join(v)) if isinstance(v, tuple) else str(v)
+		for v in variant
+	]
+	return f"{kind}:{filters}" + "".join(f"|{p}" for p in parts)
+
+
+def query_shape_stats() -> dict[str, dict]:
+	"""Şekil bazında çağrı sayısı ve süreler.
+
+	build_ms ifadenin ilk kuruluşu, prepare_ms sonraki çağrılarda önbellekten
+	alınması, execute_ms veritabanında çalıştırma süresidir.
+	"""
+	return {
+		name: {
+			"calls": stats["calls"],
+			"build_ms": round(stats["build_ms"], 3),
+			"avg_prepare_ms": round(stats["prepare_ms"] / max(stats["calls"] - 1, 1), 4),
+			"avg_execute_ms": round(stats["execute_ms"] / stats["calls"], 3),
+		}
+		for name, stats in _shape_stats.items()
+	}
+
+
+def filter_tenders(
+	db: Session,
+	query: str | None,
+	source_slug: str | None,
+	date_from: datetime | None,
+	date_to: datetime | None,
+	limit: int,
+	offset: int,
+	category: str | None = None,
+):
+	shape = _filter_shape(query, source_slug, date_from, date_to, category)
+
+	def build():
+		stmt = select(models.Tender).options(joinedload(models.Tender.source))
+		if shape.source:
+			stmt = stmt.join(models.Source)
+		conditions = _tender_conditions(shape)
+		if conditions:
+			stmt = stmt.where(and_(*conditions))
+		return (
+			stmt.order_by(desc(models.Tender.published_at), desc(models.Tender.id))
+			.limit(bindparam("limit"))
+			.offset(bindparam("offset"))
+		)
+
+	params = _filter_params(query, source_slug, date_from, date_to, category)
+	params.update(limit=limit, offset=offset)
+	return _execute_shape(db, ("orm", shape), build, params).scalars().all()
+
+
+def _tender_list_columns(fields: tuple[str, ...], snippet: bool) -> list:
+	columns = []
+	for name in fields:
+		if name == "description" and snippet:
+			# Açıklama veritabanında kırpılır, tam metin hiç okunmaz
+			columns.append(func.substr(models.Tender.description, 1, bindparam("snippet_len")).label("description"))
+		elif name == "source":
+			columns += [
+				models.Tender.source_id.label("source__id"),
+				models.Source.name.label("source__name"),
+				models.Source.url.label("source__url"),
+				models.Source.slug.label("source__slug"),
+			]
+		else:
+			columns.append(getattr(models.Tender, name).label(name))
+	return columns
+
+
+def search_tender_rows(
+	db: Session,
+	query: str | None,
+	source_slug: str | None,
+	date_from: datetime | None,
+	date_to: datetime | None,
+	limit: int,
+	offset: int,
+	fields: tuple[str, ...] | None = None,
+	snippet_len: int | None = None,
+	category: str | None = None,
+) -> list[dict]:
+	"""filter_tenders ile aynı sonuçları ORM hidrasyonu yapmadan TenderRow sözlükleri olarak döndürür.
+
+	fields verilirse yalnızca o kolonlar seçilir (id her zaman dahil); istenmeyen
+	açıklama kolonu hiç okunmaz.
+	"""
+	shape = _filter_shape(query, source_slug, date_from, date_to, category)
+	fields = TENDER_FIELDS if not fields else ("id",) + tuple(f for f in fields if f != "id")
+	snippet = bool(snippet_len) and "description" in fields
+
+	def build():
+		stmt = select(*_tender_list_columns(fields, snippet)).select_from(models.Tender)
+		if "source" in fields or shape.source:
+			stmt = stmt.outerjoin(models.Source, models.Tender.source_id == models.Source.id)
+		conditions = _tender_conditions(shape)
+		if conditions:
+			stmt = stmt.where(and_(*conditions))
+		return (
+			stmt.order_by(desc(models.Tender.published_at), desc(models.Tender.id))
+			.limit(bindparam("limit"))
+			.offset(bindparam("offset"))
+		)
+
+	params = _filter_params(query, source_slug, date_from, date_to, category)
+	params.update(limit=limit, offset=offset)
+	if snippet:
+		params["snippet_len"] = snippet_len
+	result = _execute_shape(db, ("list", shape, fields, snippet), build, params)
+	keys = list(result.keys())
+	if "source__slug" not in keys:
+		return [dict(zip(keys, row)) for row in result]
+
+	rows = []
+	for row in result:
+		item = dict(zip(keys, row))
+		source = {
+			"id": item.pop("source__id"),
+			"name": item.pop("source__name"),
+			"url": item.pop("source__url"),
+			"slug": item.pop("source__slug"),
+		}
+		item["source"] = source if source["slug"] is not None else None
+		rows.append(item)
+	return rows
+
+
+def tender_facet_counts(
+	db: Session,
+	query: str | None,
+	source_slug: str | None,
+	date_from: datetime | None,
+	date_to: datetime | None,
+	category: str | None = None,
+) -> dict:
+	"""Filtreye uyan ihalelerin kaynak, kategori ve ay bazında sayıları.
+
+	Tek ifade: filtrelenmiş satırlar bir CTE'de bir kez seçilir (SQLite birden
+	fazla kullanılan CTE'yi materialize eder), üç GROUP BY UNION ALL ile birleşir.
+	Sayılar tüm filtreler uygulanmış sonuç kümesine aittir.
+	"""
+	shape = _filter_shape(query, source_slug, date_from, date_to, category)
+
+	def build():
+		matched = select(
+			models.Tender.source_id,
+			func.coalesce(models.Tender.category, "").label("category"),
+			func.substr(models.Tender.published_at, 1, 7, type_=String).label("month"),
+		).select_from(models.Tender)
+		if shape.source:
+			matched = matched.join(models.Source, models.Tender.source_id == models.Source.id)
+		conditions = _tender_conditions(shape)
+		if conditions:
+			matched = matched.where(and_(*conditions))
+		matched = matched.cte("matched")
+		return union_all(
+			select(literal("source"), models.Source.slug, models.Source.name, func.count())
+			.select_from(matched)
+			.outerjoin(models.Source, matched.c.source_id == models.Source.id)
+			.group_by(matched.c.source_id),
+			select(literal("category"), matched.c.category, null(), func.count())
+			.group_by(matched.c.category),
+			select(literal("month"), matched.c.month, null(), func.count())
+			.where(matched.c.month.isnot(None))
+			.group_by(matched.c.month),
+		)
+
+	params = _filter_params(query, source_slug, date_from, date_to, category)
+	facets = {"source": [], "category": [], "month": []}
+	for dimension, key, name, count in _execute_shape(db, ("facets", shape), build, params):
+		if dimension == "source":
+			facets["source"].append({"slug": key, "name": name, "count": count})
+		elif dimension == "category":
+			facets["category"].append({"category": key or None, "count": count})
+		else:
+			facets["month"].append({"month": key, "count": count})
+	facets["source"].sort(key=lambda f: -f["count"])
+	facets["category"].sort(key=lambda f: -f["count"])
+	facets["month"].sort(key=lambda f: f["month"])
+	return facets
+
+
+def stream_tender_export_rows(
+	db: Session,
+	query: str | None,
+	source_slug: str | None,
+	date_from: datetime | None,
+	date_to: datetime | None,
+	limit: int | None = None,
+	offset: int = 0,
+	category: str | None = None,
+	yield_per: int = 500,
+):
+	"""Dışa aktarım kolonlarını sunucu tarafı imleçle okuyan sonuç nesnesi döndürür"""
+	shape = _filter_shape(query, source_slug, date_from, date_to, category)
+	has_limit = limit is not None
+
+	def build():
+		stmt = (
+			select(
+				models.Tender.id,
+				models.Tender.title,
+				models.Tender.url,
+				models.Tender.description,
+				models.Tender.published_at,
+				models.Source.slug,
+			)
+			.outerjoin(models.Source, models.Tender.source_id == models.Source.id)
+		)
+		conditions = _tender_conditions(shape)
+		if conditions:
+			stmt = stmt.where(and_(*conditions))
+		stmt = stmt.order_by(desc(models.Tender.published_at), desc(models.Tender.id))
+		if has_limit:
+			stmt = stmt.limit(bindparam("limit"))
+		return stmt.offset(bindparam("offset")).execution_options(stream_results=True, yield_per=yield_per)
+
+	params = _filter_params(query, source_slug, date_from, date_to, category)
+	params["offset"] = offset
+	if has_limit:
+		params["limit"] = limit
+	return _execute_shape(db, ("export", shape, has_limit, yield_per), build, params)
 
 
 # User CRUD operations
@@ -153,3 +617,252 @@ def delete_user(db: Session, user_id: int) -> bool:
 	db.delete(db_user)
 	db.commit()
 	return True
+
+
+# Saved search CRUD operations
+def create_saved_search(db: Session, user_id: int, name: str, query: str | None, source_slug: str | None, category: str | None) -> models.SavedSearch:
+	saved = models.SavedSearch(
+		user_id=user_id,
+		name=name,
+		query=query or None,
+		source_slug=source_slug or None,
+		category=category or None,
+	)
+	db.add(saved)
+	db.commit()
+	db.refresh(saved)
+	saved_search_index.invalidate()
+	return saved
+
+
+def get_saved_searches(db: Session, user_id: int) -> list[tuple[models.SavedSearch, int]]:
+	"""Kullanıcının kayıtlı aramaları ve eşleşme sayıları"""
+	match_count = (
+		select(func.count())
+		.where(models.SavedSearchMatch.saved_search_id == models.SavedSearch.id)
+		.correlate(models.SavedSearch)
+		.scalar_subquery()
+	)
+	return db.execute(
+		select(models.SavedSearch, match_count)
+		.where(models.SavedSearch.user_id == user_id)
+		.order_by(models.SavedSearch.id)
+	).all()
+
+
+def get_saved_search(db: Session, user_id: int, saved_search_id: int) -> models.SavedSearch | None:
+	return db.execute(
+		select(models.SavedSearch).where(
+			models.SavedSearch.id == saved_search_id,
+			models.SavedSearch.user_id == user_id,
+		)
+	).scalar_one_or_none()
+
+
+def delete_saved_search(db: Session, saved: models.SavedSearch):
+	db.execute(delete(models.SavedSearchMatch).where(models.SavedSearchMatch.saved_search_id == saved.id))
+	db.delete(saved)
+	db.commit()
+	saved_search_index.invalidate()
+
+
+def get_saved_search_matches(db: Session, saved_search_id: int, limit: int, offset: int) -> list[models.Tender]:
+	"""Kayıtlı aramanın eşleşmeleri, en yeni ihale önce; tenders taranmaz"""
+	return db.execute(
+		select(models.Tender)
+		.options(joinedload(models.Tender.source))
+		.join(models.SavedSearchMatch, models.SavedSearchMatch.tender_id == models.Tender.id)
+		.where(models.SavedSearchMatch.saved_search_id == saved_search_id)
+		.order_by(desc(models.SavedSearchMatch.tender_id))
+		.limit(limit)
+		.offset(offset)
+	).scalars().all()
+
+
+# Mail schedule CRUD operations
+def create_mail_schedule(db: Session, recipients: list[str], **fields) -> models.MailSchedule:
+	"""Planı ve alıcı imleçlerini oluşturur; ilk özet bundan sonra eklenen ihaleleri içerir"""
+	schedule = models.MailSchedule(recipients=json.dumps(recipients), **fields)
+	db.add(schedule)
+	db.flush()
+	start = max_tender_id(db)
+	db.add_all(
+		models.MailDeliveryCursor(schedule_id=schedule.id, recipient=recipient, last_tender_id=start)
+		for recipient in dict.fromkeys(recipients)
+	)
+	db.commit()
+	db.refresh(schedule)
+	return schedule
+
+
+def get_mail_schedules(db: Session, active_only: bool = False) -> list[models.MailSchedule]:
+	stmt = select(models.MailSchedule).order_by(models.MailSchedule.id)
+	if active_only:
+		stmt = stmt.where(models.MailSchedule.is_active.is_(True))
+	return db.execute(stmt).scalars().all()
+
+
+def get_mail_schedule(db: Session, schedule_id: int) -> models.MailSchedule | None:
+	return db.get(models.MailSchedule, schedule_id)
+
+
+def delete_mail_schedule(db: Session, schedule: models.MailSchedule):
+	db.execute(delete(models.MailDeliveryCursor).where(models.MailDeliveryCursor.schedule_id == schedule.id))
+	db.delete(schedule)
+	db.commit()
+
+
+def claim_mail_schedules(db: Session, schedule_ids: list[int], fire_time: datetime) -> list[models.MailSchedule]:
+	"""fire_time slotunu henüz göndermemiş planları talep eder.
+
+	Koşullu güncelleme sayesinde aynı slotu birden fazla süreç tetiklese de
+	her plan bir kez gönderilir.
+	"""
+	claimed = []
+	for schedule_id in schedule_ids:
+		taken = db.execute(
+			update(models.MailSchedule)
+			.where(
+				models.MailSchedule.id == schedule_id,
+				models.MailSchedule.is_active.is_(True),
+				or_(models.MailSchedule.last_sent.is_(None), models.MailSchedule.last_sent < fire_time),
+			)
+			.values(last_sent=fire_time)
+		).rowcount
+		if taken:
+			claimed.append(schedule_id)
+	db.commit()
+	if not claimed:
+		return []
+	return db.execute(
+		select(models.MailSchedule).where(models.MailSchedule.id.in_(claimed)).order_by(models.MailSchedule.id)
+	).scalars().all()
+
+
+def max_tender_id(db: Session) -> int:
+	return db.execute(select(func.coalesce(func.max(models.Tender.id), 0))).scalar_one()
+
+
+def get_delivery_cursors(db: Session, schedule_ids: list[int]) -> dict[tuple[int, str], int]:
+	"""(plan id, alıcı) -> son gönderilen ihale id'si"""
+	rows = db.execute(
+		select(
+			models.MailDeliveryCursor.schedule_id,
+			models.MailDeliveryCursor.recipient,
+			models.MailDeliveryCursor.last_tender_id,
+		).where(models.MailDeliveryCursor.schedule_id.in_(schedule_ids))
+	).all()
+	return {(schedule_id, recipient): last_id for schedule_id, recipient, last_id in rows}
+
+
+def advance_delivery_cursors(db: Session, deliveries: list[tuple[int, str]], tender_id: int, delivered_at: datetime):
+	"""İmleçleri tender_id'ye ilerletir; commit etmez (outbox kaydıyla aynı işlemde commit edilmeli)"""
+	for schedule_id, recipient in deliveries:
+		moved = db.execute(
+			update(models.MailDeliveryCursor)
+			.where(
+				models.MailDeliveryCursor.schedule_id == schedule_id,
+				models.MailDeliveryCursor.recipient == recipient,
+				models.MailDeliveryCursor.last_tender_id < tender_id,
+			)
+			.values(last_tender_id=tender_id, delivered_at=delivered_at)
+		).rowcount
+		if not moved and db.get(models.MailDeliveryCursor, (schedule_id, recipient)) is None:
+			db.add(models.MailDeliveryCursor(
+				schedule_id=schedule_id, recipient=recipient, last_tender_id=tender_id, delivered_at=delivered_at,
+			))
+
+
+def new_tenders_since(
+	db: Session,
+	since_id: int,
+	until_id: int,
+	query: str | None,
+	source_slug: str | None,
+	date_from: datetime | None,
+	date_to: datetime | None,
+	category: str | None,
+	limit: int,
+) -> tuple[list[models.Tender], int]:
+	"""(since_id, until_id] aralığında eklenen, filtreye uyan ihaleler (en yeni önce, en fazla limit) ve toplamı.
+
+	id aralığı birincil anahtar (rowid) aralığıdır; sorgu yalnızca yeni
+	satırları okur. until_id, sorgudan önce alınan kesim noktasıdır; imleç
+	buraya ilerletilince eşleşmeyen satırlar da bir daha taranmaz.
+	"""
+	shape = _filter_shape(query, source_slug, date_from, date_to, category)
+
+	def where(stmt):
+		if shape.source:
+			stmt = stmt.join(models.Source, models.Source.id == models.Tender.source_id)
+		return stmt.where(
+			models.Tender.id > bindparam("since_id"),
+			models.Tender.id <= bindparam("until_id"),
+			*_tender_conditions(shape),
+		)
+
+	params = _filter_params(query, source_slug, date_from, date_to, category)
+	params.update(since_id=since_id, until_id=until_id)
+	total = _execute_shape(
+		db, ("new_count", shape),
+		lambda: where(select(func.count()).select_from(models.Tender)),
+		params,
+	).scalar_one()
+	if not total:
+		return [], 0
+
+	params["limit"] = limit
+	tenders = _execute_shape(
+		db, ("new", shape),
+		lambda: where(select(models.Tender).options(joinedload(models.Tender.source)))
+		.order_by(desc(models.Tender.id))
+		.limit(bindparam("limit")),
+		params,
+	).scalars().all()
+	return tenders, total
+
+
+# App state (süreçler arası watermark'lar)
+def get_app_state(db: Session, key: str) -> str | None:
+	return db.execute(select(models.AppState.value).where(models.AppState.key == key)).scalar_one_or_none()
+
+
+def set_app_state(db: Session, key: str, value: str):
+	"""Değeri koşulsuz yazar ve commit eder"""
+	updated = db.execute(
+		update(models.AppState).where(models.AppState.key == key).values(value=value)
+	).rowcount
+	if not updated:
+		db.add(models.AppState(key=key, value=value))
+	try:
+		db.commit()
+	except IntegrityError:
+		# Aynı anda başka bir süreç ilk kez yazdı; onun değeri yeterince güncel
+		db.rollback()
+
+
+def swap_app_state(db: Session, key: str, expected: str | None, value: str, commit: bool = True) -> bool:
+	"""Değer hâlâ expected ise value yapar (compare-and-set).
+
+	Aynı watermark'ı ilerletmeye çalışan süreçlerden yalnızca biri başarılı olur.
+	commit=False ise değişiklik çağıranın transaction'ında kalır; başarısızlıkta
+	transaction geri alınır.
+	"""
+	if expected is None:
+		db.add(models.AppState(key=key, value=value))
+		try:
+			db.commit() if commit else db.flush()
+		except IntegrityError:
+			db.rollback()
+			return False
+		return True
+	swapped = db.execute(
+		update(models.AppState)
+		.where(models.AppState.key == key, models.AppState.value == expected)
+		.values(value=value)
+	).rowcount
+	if commit:
+		db.commit()
+	elif not swapped:
+		db.rollback()
+	return bool(swapped)
@@ -4,13 +4,23 @@ from sqlalchemy.orm import Session
 from .utils import get_password_hash
 
 from .config import settings
-from .db import Base, engine, get_db
+from .db import get_db, SessionLocal
+from . import crud
+from .migrations import init_db
 from .services.scheduler import scheduler_service
-from .routers import tenders, mail, auth
+from .services.facet_index import facet_index
+from .services.scrape_manager import register_sources
+from .services.mail_transport import mail_transport
+from .services.outbox import outbox_worker
+from .services.mail_templates import mail_templates
+from .services.mail_scheduler import mail_scheduler
+from .services.change_watcher import change_watcher
+from .services.scrape_jobs import NO_WORKER_WARNING, worker_alive
+from .routers import tenders, mail, auth, admin, saved_searches
 from .models import User
 
-# Veritabanı tablolarını oluştur
-Base.metadata.create_all(bind=engine)
+# Veritabanı tablolarını oluştur ve bekleyen migration'ları uygula
+init_db()
 
 app = FastAPI(title="İhale Takip API")
 
@@ -27,6 +37,8 @@ app.add_middleware(
 app.include_router(auth.router, prefix="/api")
 app.include_router(tenders.router, prefix="/api")
 app.include_router(mail.router, prefix="/api/mail")
+app.include_router(admin.router, prefix="/api")
+app.include_router(saved_searches.router, prefix="/api")
 
 
 def create_default_admin():
@@ -62,9 +74,25 @@ def create_default_admin():
 @app.on_event("startup")
 async def startup_event():
     create_default_admin()
+    with SessionLocal() as db:
+        register_sources(db)
+        # Index kurulmadan önceki son seq; arada eklenenler izleyicide tekrar uygulanır
+        since = crud.max_change_seq(db)
+        facet_index.load(db)
+        if not worker_alive(db):
+            print(f"⚠ {NO_WORKER_WARNING}")
+    print(f"✓ Mail şablonları derlendi: {mail_templates.preload()}")
+    # Taramalar ayrı worker süreçlerinde çalışır; eklenen ihaleler değişiklik akışından izlenir
+    change_watcher.start(since)
+    outbox_worker.start()
     scheduler_service.start()
+    with SessionLocal() as db:
+        mail_scheduler.sync(db)
 
 # Uygulama kapatıldığında zamanlayıcıyı durdur
 @app.on_event("shutdown")
 async def shutdown_event():
-    scheduler_service.stop()
\ No newline at end of file
+    scheduler_service.stop()
+    await change_watcher.stop()
+    await outbox_worker.stop()
+    mail_transport.close()
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""Mevcut veritabanına (data.db) sürümlü, tekrar çalıştırılabilir şema değişiklikleri uygular.
+
+create_all yalnızca eksik tabloları oluşturur; var olan tablolara index/kolon
+eklemez. Bu değişiklikler burada sürüm numarasıyla tanımlanır ve
+schema_migrations tablosunda kayıt altına alınır. Her adım idempotenttir
+(IF NOT EXISTS / kolon varlık kontrolü); iki süreç aynı anda çalıştırsa da
+sonuç değişmez.
+"""
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from .db import Base, engine
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def create_index(name: str, table: str, columns: str) -> Callable[[Connection], None]:
+    def apply(conn: Connection):
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+    return apply
+
+
+def add_column(table: str, column: str, ddl: str) -> Callable[[Connection], None]:
+    """Kolon yoksa ekler; ddl ör. 'VARCHAR NULL'"""
+    def apply(conn: Connection):
+        existing = {c["name"] for c in inspect(conn).get_columns(table)}
+        if column not in existing:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return apply
+
+
+def rebuild_tender_stats(conn: Connection):
+    """tender_stats sayaçlarını mevcut ihalelerden doldurur"""
+    from . import crud
+    crud.rebuild_tender_stats(conn)
+
+
+def backfill_tender_changes(conn: Connection):
+    """Mevcut ihaleleri değişiklik akışına id sırasıyla 'insert' olarak yazar"""
+    if conn.execute(text("SELECT 1 FROM tender_changes LIMIT 1")).first():
+        return
+    conn.execute(text(
+        "INSERT INTO tender_changes (tender_id, op, changed_at) "
+        "SELECT id, 'insert', COALESCE(created_at, CURRENT_TIMESTAMP) FROM tenders ORDER BY id"
+    ))
+
+
+MIGRATIONS: List[Migration] = [
+    # Varsayılan liste ve tarih aralığı: ORDER BY published_at DESC, id DESC
+    Migration(1, "tenders_published_id", create_index(
+        "ix_tenders_published_id", "tenders", "published_at DESC, id DESC")),
+    # Kaynak filtresi + aynı sıralama
+    Migration(2, "tenders_source_published_id", create_index(
+        "ix_tenders_source_published_id", "tenders", "source_id, published_at DESC, id DESC")),
+    # Kategori filtresi + aynı sıralama
+    Migration(3, "tenders_category_published_id", create_index(
+        "ix_tenders_category_published_id", "tenders", "category, published_at DESC, id DESC")),
+    # Dashboard sayaçları; sonrasında ingestion/recategorize ile artımlı güncellenir
+    Migration(4, "tender_stats_backfill", rebuild_tender_stats),
+    # Change feed'in ilk hali: mevcut ihaleler
+    Migration(5, "tender_changes_backfill", backfill_tender_changes),
+    # Zamanlanmış özetler: kaynak/kategori filtresi + id > imleç aralığı
+    Migration(6, "tenders_source_id", create_index(
+        "ix_tenders_source_id", "tenders", "source_id, id")),
+    Migration(7, "tenders_category_id", create_index(
+        "ix_tenders_category_id", "tenders", "category, id")),
+]
+
+
+def _ensure_table(conn: Connection):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at DATETIME NOT NULL)"
+    ))
+
+
+def applied_versions(bind: Engine = engine) -> set[int]:
+    with bind.begin() as conn:
+        _ensure_table(conn)
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(bind: Engine = engine) -> List[int]:
+    """Uygulanmamış migration'ları sırayla uygular, uygulanan sürümleri döndürür"""
+    done = applied_versions(bind)
+    applied = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in done:
+            continue
+        try:
+            with bind.begin() as conn:
+                migration.apply(conn)
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+                    {"v": migration.version, "n": migration.name, "t": datetime.utcnow()},
+                )
+        except IntegrityError:
+            # Başka bir süreç aynı sürümü az önce uyguladı
+            continue
+        print(f"✓ Migration {migration.version} uygulandı: {migration.name}")
+        applied.append(migration.version)
+    return applied
+
+
+def init_db(bind: Engine = engine):
+    """Eksik tabloları oluşturur ve bekleyen migration'ları uygular"""
+    from . import models  # noqa: F401 - tüm tabloların metadata'ya kaydı için
+    Base.metadata.create_all(bind=bind)
+    run_migrations(bind)
@@ -2,5 +2,12 @@ from .source import Source
 from .tender import Tender
 from .schedule import ScheduleConfig, ScheduleUpdate
 from .user import User
+from .stats import TenderStat
+from .change import TenderChange
+from .saved_search import SavedSearch, SavedSearchMatch
+from .outbox import MailOutbox
+from .mail_schedule import MailSchedule, MailDeliveryCursor
+from .app_state import AppState
+from .scrape_job import ScrapeJob, ScrapeTask
 
-__all__ = ['Source', 'Tender', 'ScheduleConfig', 'ScheduleUpdate', 'User']
+__all__ = ['Source', 'Tender', 'ScheduleConfig', 'ScheduleUpdate', 'User', 'TenderStat', 'TenderChange', 'SavedSearch', 'SavedSearchMatch', 'MailOutbox', 'MailSchedule', 'MailDeliveryCursor', 'AppState', 'ScrapeJob', 'ScrapeTask']
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from ..db import Base
+
+
+class AppState(Base):
+    """Süreçler arası paylaşılan küçük durum değerleri (ör. bildirim watermark'ı)"""
+    __tablename__ = "app_state"
+
+    key = Column(String(100), primary_key=True)
+    value = Column(String(200), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
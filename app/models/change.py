@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..db import Base
+
+
+class TenderChange(Base):
+    """İhale değişiklik akışı (change feed).
+
+    Her ekleme/güncelleme, değişikliği yapan transaction içinde bir satır
+    ekler. seq AUTOINCREMENT olduğu için tekrar kullanılmaz ve SQLite yazmaları
+    sıraladığından commit sırasıyla artar; aşağı akış sistemleri
+    /api/tenders/changes?since=<seq> ile yalnızca farkı okur.
+    """
+    __tablename__ = "tender_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True)
+    tender_id = Column(Integer, ForeignKey("tenders.id"), nullable=False, index=True)
+    # "insert" | "update"
+    op = Column(String(10), nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
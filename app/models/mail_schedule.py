@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy.sql import func
+from ..db import Base
+
+
+class MailSchedule(Base):
+    """Zamanlanmış ihale özeti maili; APScheduler slot işleriyle çalıştırılır"""
+    __tablename__ = "mail_schedules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sender_email = Column(String(200), nullable=False)
+    recipients = Column(Text, nullable=False)  # JSON liste
+    subject = Column(String(300), nullable=False)
+    schedule_type = Column(String(10), nullable=False, default="daily")  # daily | weekly | once
+    times = Column(Text, nullable=False)  # JSON liste, "HH:MM"
+    weekday = Column(Integer, nullable=True)  # weekly için, 0 = Pazartesi
+    scheduled_date = Column(String(10), nullable=True)  # once için, "YYYY-MM-DD"
+    filters = Column(Text, nullable=False, default="{}")  # JSON
+    is_active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Son gönderilen slotun zamanı (Europe/Istanbul, naive); aynı slotu iki kez göndermemek için
+    last_sent = Column(DateTime, nullable=True)
+
+
+class MailDeliveryCursor(Base):
+    """Plan + alıcı için son gönderilen ihale id'si; sonraki özet yalnızca daha yenilerini içerir"""
+    __tablename__ = "mail_delivery_cursors"
+
+    schedule_id = Column(Integer, ForeignKey("mail_schedules.id", ondelete="CASCADE"), primary_key=True)
+    recipient = Column(String(200), primary_key=True)
+    last_tender_id = Column(Integer, nullable=False, default=0)
+    delivered_at = Column(DateTime, nullable=True)
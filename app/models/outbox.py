@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, LargeBinary, Index
+from sqlalchemy.sql import func
+from ..db import Base
+
+
+class MailOutbox(Base):
+    """Gönderilmeyi bekleyen mailler.
+
+    İstekler maili buraya yazıp hemen döner; outbox worker'ı hız sınırına
+    uyarak gönderir, hatada üstel bekleme ile tekrar dener, deneme hakkı
+    biterse "dead" durumuna alır. Süreç çökse de bekleyen mailler kaybolmaz.
+    """
+    __tablename__ = "mail_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # "pending" | "sending" | "sent" | "dead"
+    status = Column(String(10), nullable=False, default="pending")
+    sender = Column(String(255), nullable=True)
+    recipients = Column(Text, nullable=False)  # JSON liste
+    subject = Column(String(255), nullable=True)
+    message = Column(LargeBinary, nullable=False)  # RFC 5322 biçiminde hazır mesaj
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_mail_outbox_status_next_attempt", status, next_attempt_at),
+    )
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..db import Base
+
+
+class SavedSearch(Base):
+    """Kullanıcının kayıtlı araması; yeni ihaleler eklenirken bununla eşleştirilir"""
+    __tablename__ = "saved_searches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    name = Column(String(100), nullable=False)
+    query = Column(String(200), nullable=True)
+    source_slug = Column(String(50), nullable=True)
+    category = Column(String(100), nullable=True)
+    is_active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class SavedSearchMatch(Base):
+    """Ekleme anında kayıtlı aramayla eşleşen ihale"""
+    __tablename__ = "saved_search_matches"
+
+    saved_search_id = Column(Integer, ForeignKey("saved_searches.id", ondelete="CASCADE"), primary_key=True)
+    tender_id = Column(Integer, ForeignKey("tenders.id"), primary_key=True)
+    matched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from ..db import Base
+
+
+class ScrapeJob(Base):
+    """Tarama işi; API yalnızca ekler ve okur, `python -m app.worker` süreçleri yürütür"""
+    __tablename__ = "scrape_jobs"
+
+    id = Column(String(32), primary_key=True)
+    # "queued" | "running" | "completed" | "failed"
+    status = Column(String(10), nullable=False, default="queued")
+    sites = Column(Text, nullable=True)  # JSON liste; boşsa tüm kaynaklar
+    inserted = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    tasks = relationship("ScrapeTask", order_by="ScrapeTask.id", lazy="selectin", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_scrape_jobs_status_created", status, created_at),
+    )
+
+
+class ScrapeTask(Base):
+    """İşin tek kaynaklık parçası.
+
+    Worker'lar görevi koşullu UPDATE ile talep eder ve çalışırken
+    heartbeat_at'i yeniler; heartbeat SCRAPE_LEASE_SECONDS'tan eskiyse worker
+    düşmüş sayılır ve görev yeniden "pending" olur.
+    """
+    __tablename__ = "scrape_tasks"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String(32), ForeignKey("scrape_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    slug = Column(String(50), nullable=False)
+    name = Column(String(200), nullable=False)
+    # "pending" | "running" | "completed" | "failed"
+    status = Column(String(10), nullable=False, default="pending")
+    worker_id = Column(String(100), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    heartbeat_at = Column(DateTime, nullable=True)
+    inserted = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_scrape_tasks_status_id", status, id),
+    )
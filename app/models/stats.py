@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String
+from ..db import Base
+
+
+class TenderStat(Base):
+    """Kaynak / kategori / gün bazında ihale sayıları.
+
+    İhale ekleme ve yeniden kategorize etme ile aynı transaction içinde
+    güncellenir; dashboard sayıları tenders tablosunu taramadan buradan okunur.
+    """
+    __tablename__ = "tender_stats"
+
+    # dimension: "total" | "source" | "category" | "day"
+    dimension = Column(String(20), primary_key=True)
+    # source -> source_id, category -> kategori anahtarı ("" = kategorisiz), day -> YYYY-MM-DD
+    key = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
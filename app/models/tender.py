@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..db import Base
@@ -19,3 +19,13 @@ class Tender(Base):
 
     # Relationship
     source = relationship("Source", back_populates="tenders")
+
+    # Arama sorgularının sıralama/filtre şekilleriyle eşleşen index'ler (bkz. app/migrations.py)
+    __table_args__ = (
+        Index("ix_tenders_published_id", published_at.desc(), id.desc()),
+        Index("ix_tenders_source_published_id", source_id, published_at.desc(), id.desc()),
+        Index("ix_tenders_category_published_id", category, published_at.desc(), id.desc()),
+        # Zamanlanmış özetlerin id > imleç aralığı
+        Index("ix_tenders_source_id", source_id, id),
+        Index("ix_tenders_category_id", category, id),
+    )
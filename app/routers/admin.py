@@ -1,4 +1,21 @@
-from fastapi import APIRouter
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from ..db import get_db
+from .. import models
+from ..services.singleflight import singleflight_stats
+from ..services.query_cache import query_cache_stats
+from ..crud import query_shape_stats
+from ..services.facet_index import facet_index
+from ..services.broker import tender_broker
+from ..services.percolator import saved_search_index
+from ..services.mail_transport import mail_transport
+from ..services.outbox import outbox_worker, outbox_counts
+from ..services.digest import digest_cache
+from ..services.mail_templates import mail_templates
+from ..services.mail_scheduler import mail_scheduler
+from ..services.change_watcher import change_watcher
+from ..services.scrape_jobs import scrape_job_counts
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -11,3 +28,54 @@ def health():
 @router.get("/version")
 def version():
 	return {"version": "0.1.0"}
+
+
+@router.get("/metrics")
+def metrics(db: Session = Depends(get_db)):
+	return {
+		"singleflight": singleflight_stats(),
+		"query_cache": {**query_cache_stats(), digest_cache.name: digest_cache.stats()},
+		"query_shapes": query_shape_stats(),
+		"facet_index": facet_index.stats(),
+		"tender_stream": tender_broker.stats(),
+		"saved_searches": saved_search_index.stats(),
+		"mail_transport": mail_transport.stats(),
+		"outbox": outbox_worker.stats(),
+		"mail_templates": mail_templates.stats(),
+		"mail_schedules": mail_scheduler.stats(),
+		"change_watcher": change_watcher.stats(),
+		"scrape_tasks": scrape_job_counts(db),
+	}
+
+
+@router.get("/outbox")
+def outbox(db: Session = Depends(get_db)):
+	"""Outbox durum sayıları ve dead-letter'daki son mailler"""
+	dead = (
+		db.query(models.MailOutbox)
+		.filter(models.MailOutbox.status == "dead")
+		.order_by(models.MailOutbox.id.desc())
+		.limit(50)
+		.all()
+	)
+	return {
+		"counts": outbox_counts(db),
+		"dead": [
+			{"id": m.id, "subject": m.subject, "attempts": m.attempts, "last_error": m.last_error, "created_at": m.created_at}
+			for m in dead
+		],
+	}
+
+
+@router.post("/outbox/{outbox_id}/retry")
+def retry_outbox(outbox_id: int, db: Session = Depends(get_db)):
+	"""Dead-letter'daki maili yeniden kuyruğa alır"""
+	item = db.get(models.MailOutbox, outbox_id)
+	if not item or item.status != "dead":
+		raise HTTPException(status_code=404, detail="Dead-letter'da böyle bir mail yok")
+	item.status = "pending"
+	item.attempts = 0
+	item.next_attempt_at = datetime.utcnow()
+	db.commit()
+	outbox_worker.wake()
+	return {"id": item.id, "status": item.status}
@@ -1,16 +1,18 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List
+from typing import List, Literal, Optional
 import json
 import os
-import uuid
 from datetime import time, datetime
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from sqlalchemy.orm import Session
 
 from ..models.schedule import ScheduleUpdate, ScheduleConfig
 from ..db import get_db
-from .. import crud
+from .. import crud, models
 from ..services.email_service import send_email
+from ..services.digest import enqueue_digest, manual_mail_digest
+from ..services.mail_scheduler import mail_scheduler
+from ..config import settings
 
 router = APIRouter()
 
@@ -55,7 +57,7 @@ def save_schedule(config: ScheduleConfig) -> None:
             detail=f"Zamanlama ayarları kaydedilirken hata: {str(e)}"
         )
 
-@router.get("/schedules", response_model=ScheduleUpdate)
+@router.get("/schedules/config", response_model=ScheduleUpdate)
 async def get_schedule():
     """Mevcut zamanlama ayarlarını döndürür"""
     config = load_schedule()
@@ -81,79 +83,21 @@ async def update_schedule(schedule: ScheduleUpdate):
 async def send_manual_mail(request: ManualMailRequest, db: Session = Depends(get_db)):
     """Manuel mail gönderimi"""
     try:
-        # İhale verilerini filtrele
-        filters = request.filters
-        date_from = datetime.fromisoformat(filters.get('date_from')) if filters.get('date_from') else None
-        date_to = datetime.fromisoformat(filters.get('date_to')) if filters.get('date_to') else None
-        
-        tenders = crud.filter_tenders(
-            db=db,
-            query=filters.get('query'),
-            source_slug=filters.get('source_slug'),
-            date_from=date_from,
-            date_to=date_to,
-            limit=filters.get('limit', 100),
-            offset=0,
+        # Gövde filtre seti başına bir kez render edilir; mesaj tek kez kurulup
+        # alıcılara zarf grupları halinde outbox'a yazılır
+        digest = manual_mail_digest(db, request.subject, request.filters)
+        outbox_ids = enqueue_digest(
+            db,
+            subject=request.subject,
+            html=digest.html,
+            recipients=request.recipient_emails,
         )
         
-        # Email içeriğini template ile hazırla
-        tender_count = len(tenders)
-        
-        # Template için veri hazırla
-        template_data = {
-            'subject': request.subject,
-            'current_date': datetime.now().strftime('%d.%m.%Y'),
-            'tender_count': tender_count,
-            'tenders': tenders[:50],  # İlk 50 ihale
-            'sources_count': 1 if filters.get('source_slug') else None,
-            'categories_count': None,
-            'filters_applied': []
-        }
-        
-        # Uygulanan filtreleri topla
-        if filters.get('query'):
-            template_data['filters_applied'].append(f"Arama: {filters['query']}")
-        if filters.get('source_slug'):
-            source = next((t.source.name for t in tenders if t.source and t.source.slug == filters['source_slug']), filters['source_slug'])
-            template_data['filters_applied'].append(f"Kaynak: {source}")
-        if filters.get('date_from'):
-            template_data['filters_applied'].append(f"Başlangıç: {filters['date_from']}")
-        if filters.get('date_to'):
-            template_data['filters_applied'].append(f"Bitiş: {filters['date_to']}")
-        
-        # Template'i render et
-        from jinja2 import Environment, FileSystemLoader
-        import os
-        
-        template_dir = os.path.join(os.path.dirname(__file__), '..', 'services', 'email_templates')
-        env = Environment(loader=FileSystemLoader(template_dir))
-        template = env.get_template('manual_mail.html')
-        html_content = template.render(**template_data)
-        
-        # Mail gönder (test modunda sadece log)
-        try:
-            for recipient in request.recipient_emails:
-                # SMTP ayarları eksikse sadece log yap
-                if not all([
-                    hasattr(settings, 'SMTP_USERNAME') and settings.SMTP_USERNAME,
-                    hasattr(settings, 'SMTP_PASSWORD') and settings.SMTP_PASSWORD
-                ]):
-                    print(f"📧 Test Mode: Mail would be sent to {recipient}")
-                    print(f"📧 Subject: {request.subject}")
-                    print(f"📧 Content preview: {html_content[:200]}...")
-                else:
-                    await send_email(
-                        recipient=recipient,
-                        subject=request.subject,
-                        html_content=html_content
-                    )
-        except Exception as e:
-            print(f"⚠️ Mail sending failed, but continuing: {e}")
-        
         return {
-            "message": "Mail başarıyla gönderildi",
-            "tender_count": tender_count,
-            "recipients": len(request.recipient_emails)
+            "message": "Mail gönderim kuyruğuna alındı",
+            "tender_count": digest.tender_count,
+            "recipients": len(request.recipient_emails),
+            "outbox_ids": outbox_ids,
         }
         
     except Exception as e:
@@ -205,73 +149,109 @@ class ScheduleRequest(BaseModel):
     sender_email: EmailStr
     recipient_emails: List[EmailStr]
     subject: str
-    schedule_type: str = "daily"
-    times: List[str]
-    filters: dict
+    schedule_type: Literal["daily", "weekly", "once"] = "daily"
+    times: List[str] = []
+    scheduled_time: Optional[str] = None  # tek saat (eski istemciler)
+    scheduled_date: Optional[str] = None  # once için YYYY-MM-DD
+    weekday: Optional[int] = Field(default=None, ge=0, le=6)  # weekly için, 0 = Pazartesi
+    filters: dict = {}
     is_active: bool = True
 
+    @model_validator(mode="after")
+    def normalize_times(self):
+        times = self.times + ([self.scheduled_time] if self.scheduled_time else [])
+        # "9:00" -> "09:00"; slot anahtarları tek biçimde olmalı
+        self.times = sorted({datetime.strptime(t, "%H:%M").strftime("%H:%M") for t in times})
+        if not self.times:
+            raise ValueError("En az bir gönderim saati gerekli")
+        if self.schedule_type == "once":
+            if not self.scheduled_date:
+                raise ValueError("Tek seferlik plan için scheduled_date gerekli")
+            datetime.strptime(self.scheduled_date, "%Y-%m-%d")
+        return self
+
 class MailSchedule(BaseModel):
-    id: str
+    id: int
     sender_email: str
     recipient_emails: List[str]
     subject: str
     schedule_type: str
-    scheduled_time: str = None
-    scheduled_date: str = None
+    scheduled_time: Optional[str] = None
+    scheduled_date: Optional[str] = None
+    weekday: Optional[int] = None
     filters: dict
     is_active: bool
     created_at: str
-    last_sent: str = None
-    next_run: str = None
+    last_sent: Optional[str] = None
+    next_run: Optional[str] = None
     times: List[str] = []
 
-# Basit in-memory storage (production'da veritabanı kullanılmalı)
-mail_schedules = {}
+def _schedule_out(schedule: models.MailSchedule) -> MailSchedule:
+    times = json.loads(schedule.times)
+    next_run = mail_scheduler.next_run(schedule)
+    return MailSchedule(
+        id=schedule.id,
+        sender_email=schedule.sender_email,
+        recipient_emails=json.loads(schedule.recipients),
+        subject=schedule.subject,
+        schedule_type=schedule.schedule_type,
+        scheduled_time=times[0] if times else None,
+        scheduled_date=schedule.scheduled_date,
+        weekday=schedule.weekday,
+        filters=json.loads(schedule.filters or "{}"),
+        is_active=schedule.is_active,
+        created_at=schedule.created_at.isoformat(),
+        last_sent=schedule.last_sent.isoformat() if schedule.last_sent else None,
+        next_run=next_run.isoformat() if next_run else None,
+        times=times,
+    )
 
 @router.get("/schedules", response_model=List[MailSchedule])
-async def get_mail_schedules():
+async def get_mail_schedules(db: Session = Depends(get_db)):
     """Tüm mail otomasyonlarını listele"""
-    return list(mail_schedules.values())
+    return [_schedule_out(schedule) for schedule in crud.get_mail_schedules(db)]
 
 @router.post("/schedule", response_model=MailSchedule)
-async def create_mail_schedule(request: ScheduleRequest):
-    """Yeni mail otomasyonu oluştur"""
-    schedule_id = str(uuid.uuid4())
-    
-    schedule = MailSchedule(
-        id=schedule_id,
+async def create_mail_schedule(request: ScheduleRequest, db: Session = Depends(get_db)):
+    """Yeni mail otomasyonu oluştur; plan veritabanına, işi job store'a yazılır"""
+    weekday = request.weekday
+    if request.schedule_type == "weekly" and weekday is None:
+        weekday = mail_scheduler.now().weekday()
+    schedule = crud.create_mail_schedule(
+        db,
         sender_email=str(request.sender_email),
-        recipient_emails=[str(email) for email in request.recipient_emails],
+        recipients=[str(email) for email in request.recipient_emails],
         subject=request.subject,
         schedule_type=request.schedule_type,
-        times=request.times,
-        filters=request.filters,
+        times=json.dumps(request.times),
+        weekday=weekday if request.schedule_type == "weekly" else None,
+        scheduled_date=request.scheduled_date if request.schedule_type == "once" else None,
+        filters=json.dumps(request.filters, ensure_ascii=False),
         is_active=request.is_active,
-        created_at=datetime.now().isoformat(),
-        last_sent=None,
-        next_run=datetime.now().isoformat() if request.is_active else None
     )
-    
-    mail_schedules[schedule_id] = schedule
-    return schedule
+    mail_scheduler.sync(db)
+    return _schedule_out(schedule)
 
 @router.put("/schedules/{schedule_id}/toggle")
-async def toggle_schedule(schedule_id: str):
+async def toggle_schedule(schedule_id: int, db: Session = Depends(get_db)):
     """Mail otomasyonunu aktif/pasif yap"""
-    if schedule_id not in mail_schedules:
+    schedule = crud.get_mail_schedule(db, schedule_id)
+    if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
     
-    schedule = mail_schedules[schedule_id]
     schedule.is_active = not schedule.is_active
-    schedule.next_run = datetime.now().isoformat() if schedule.is_active else None
+    db.commit()
+    mail_scheduler.sync(db)
     
     return {"message": "Schedule status updated", "is_active": schedule.is_active}
 
 @router.delete("/schedules/{schedule_id}")
-async def delete_schedule(schedule_id: str):
+async def delete_schedule(schedule_id: int, db: Session = Depends(get_db)):
     """Mail otomasyonunu sil"""
-    if schedule_id not in mail_schedules:
+    schedule = crud.get_mail_schedule(db, schedule_id)
+    if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
     
-    del mail_schedules[schedule_id]
+    crud.delete_mail_schedule(db, schedule)
+    mail_scheduler.sync(db)
     return {"message": "Schedule deleted successfully"}
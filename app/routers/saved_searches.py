@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List
+from sqlalchemy.orm import Session
+
+from ..auth import get_current_active_user
+from ..db import get_db
+from .. import crud
+from ..models import User
+from ..schemas import SavedSearchCreate, SavedSearchOut, TenderOut
+
+router = APIRouter(prefix="/saved-searches", tags=["saved-searches"])
+
+
+@router.get("", response_model=List[SavedSearchOut])
+def list_saved_searches(db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+	return [
+		SavedSearchOut.model_validate(saved).model_copy(update={"match_count": count})
+		for saved, count in crud.get_saved_searches(db, current_user.id)
+	]
+
+
+@router.post("", response_model=SavedSearchOut, status_code=201)
+def create_saved_search(
+	payload: SavedSearchCreate,
+	db: Session = Depends(get_db),
+	current_user: User = Depends(get_current_active_user),
+):
+	"""Kayıtlı arama oluşturur; bundan sonra eklenen ihaleler ekleme anında eşleştirilir"""
+	return crud.create_saved_search(
+		db, current_user.id, payload.name, payload.query, payload.source_slug, payload.category,
+	)
+
+
+@router.delete("/{saved_search_id}")
+def delete_saved_search(
+	saved_search_id: int,
+	db: Session = Depends(get_db),
+	current_user: User = Depends(get_current_active_user),
+):
+	saved = crud.get_saved_search(db, current_user.id, saved_search_id)
+	if not saved:
+		raise HTTPException(status_code=404, detail="Kayıtlı arama bulunamadı")
+	crud.delete_saved_search(db, saved)
+	return {"message": "Kayıtlı arama silindi"}
+
+
+@router.get("/{saved_search_id}/matches", response_model=List[TenderOut])
+def saved_search_matches(
+	saved_search_id: int,
+	limit: int = Query(50, ge=1, le=500),
+	offset: int = Query(0, ge=0),
+	db: Session = Depends(get_db),
+	current_user: User = Depends(get_current_active_user),
+):
+	"""Kayıtlı aramayla eşleşen yeni ihaleler ("sizin için yeni")"""
+	if not crud.get_saved_search(db, current_user.id, saved_search_id):
+		raise HTTPException(status_code=404, detail="Kayıtlı arama bulunamadı")
+	return crud.get_saved_search_matches(db, saved_search_id, limit, offset)
@@ -1,28 +1,113 @@
-from fastapi import APIRouter, Depends, Response
-from typing import List
-import csv
-import io
-from ..schemas import TenderOut, TenderFilter, EmailRequest, SourceOut
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from datetime import date
+from typing import List, Literal, Optional, Union
+from ..schemas import (
+	TenderRow, TenderFilter, ExportFilter, EmailRequest, SourceOut, TenderSearchPage, TenderFacetPage,
+	parse_fields,
+)
 from ..db import get_db
 from sqlalchemy.orm import Session
 from .. import crud, models
-from ..services.emailer import send_email
-from ..services.scrape_manager import trigger_scrape_once
+from ..services.emailer import build_message
+from ..services.outbox import enqueue_mail
+from ..services import scrape_jobs
+from ..services.singleflight import search_flight, sources_flight, categories_flight
+from ..services.query_cache import (
+	tender_query_cache, tender_list_json_key, load_tender_list_json, tender_facets_key, load_tender_facets,
+)
+from ..services.exporter import iter_tender_rows, iter_tender_changes, gzip_chunks, export_stream, export_bytes
+from ..services.data_version import read_watermark
+from ..services.facet_index import facet_index, month_range
+from ..services.change_watcher import change_watcher
+from ..services.broker import tender_broker
+from ..config import settings
+from ..utils import format_sse, weak_etag, etag_matches
 
 
 router = APIRouter(prefix="/tenders", tags=["tenders"])
 
+# Liste sonuçları her istekte yeniden doğrulanır; kaynak/kategori listeleri nadiren değişir
+LIST_CACHE_CONTROL = "no-cache"
+LOOKUP_CACHE_CONTROL = "max-age=60, must-revalidate"
 
-@router.get("/search", response_model=dict)
+
+def _cache_headers(request: Request, version, cache_control: str, *parts) -> tuple[dict, bool]:
+    """(ETag/Cache-Control başlıkları, If-None-Match eşleşti mi) döndürür.
+
+    version, istek başında bir kez okunan read_watermark() değeridir; veritabanından
+    geldiği için aynı veriye her API süreci aynı ETag'i verir.
+    """
+    etag = weak_etag(version, request.url.path, *parts)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    return headers, etag_matches(request.headers.get("if-none-match"), etag)
+
+
+async def _search(
+    version, query, source_slug, date_from, date_to, limit: int, offset: int,
+    fields: tuple | None = None, snippet_len: int | None = None, category: str | None = None,
+) -> tuple[int, bytes]:
+    """Önbellekte yoksa, aynı filtreyle eşzamanlı gelen aramaları tek sorguda birleştirir.
+
+    (satır sayısı, TenderOut şeklinde JSON dizi byte'ları) döndürür. version, istek
+    başında okunan read_watermark() değeridir; daha eski sürümde başlamış bir
+    hesaplamaya katılınmaz.
+    """
+    key = tender_list_json_key(query, source_slug, date_from, date_to, limit, offset, fields, snippet_len, category)
+    found, result = tender_query_cache.get(key, version)
+    if found:
+        return result
+    return await search_flight.do(
+        (key, version), run_in_threadpool, load_tender_list_json,
+        version, query, source_slug, date_from, date_to, limit, offset, fields, snippet_len, category,
+    )
+
+
+def empty_facets() -> dict:
+    """Hata yanıtlarında facet sonucuyla aynı şekil; istemci alan varlığını kontrol etmek zorunda kalmaz"""
+    return {"source": [], "category": [], "month": []}
+
+
+async def _facets(version, query, source_slug, date_from, date_to, category: str | None = None) -> tuple[int, bytes]:
+    """Filtrenin facet sayıları; (kesin toplam, facet JSON byte'ları) döndürür"""
+    key = tender_facets_key(query, source_slug, date_from, date_to, category)
+    found, result = tender_query_cache.get(key, version)
+    if found:
+        return result
+    return await search_flight.do(
+        (key, version), run_in_threadpool, load_tender_facets,
+        version, query, source_slug, date_from, date_to, category,
+    )
+
+
+@router.get("/search", response_model=TenderSearchPage)
 async def search_tenders(
+    request: Request,
+    response: Response,
     query: str = None,
     source_slug: str = None,
+    category: str = None,
     date_from: str = None,
     date_to: str = None,
     limit: int = 20,
     offset: int = 0,
-    db: Session = Depends(get_db)
+    fields: str = None,
+    snippet_len: int = Query(default=None, ge=1, le=5000),
+    facets: bool = False,
 ):
+    try:
+        field_set = parse_fields(fields.split(",") if fields else None)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    version = await run_in_threadpool(read_watermark)
+    headers, not_modified = _cache_headers(
+        request, version, LIST_CACHE_CONTROL,
+        (query or "").lower() or None, source_slug or None, date_from, date_to, limit, offset,
+        field_set, snippet_len, category or None, facets,
+    )
+    if not_modified:
+        return Response(status_code=304, headers=headers)
     try:
         from datetime import datetime
         
@@ -40,129 +125,307 @@ async def search_tenders(
             except:
                 pass
         
-        results = crud.filter_tenders(
-            db=db,
-            query=query,
-            source_slug=source_slug,
-            date_from=date_from_obj,
-            date_to=date_to_obj,
-            limit=limit,
-            offset=offset,
+        count, tenders_json = await _search(
+            version, query, source_slug, date_from_obj, date_to_obj, limit, offset, field_set, snippet_len, category,
         )
         
-        # Toplam sayıyı hesapla (basit yaklaşım)
-        total = len(results) + offset if len(results) == limit else len(results) + offset
+        # Toplam sayıyı hesapla (basit yaklaşım); facet istenirse kesin toplam kullanılır
+        total = count + offset
+        facets_json = b""
+        if facets:
+            total, facets_json = await _facets(version, query, source_slug, date_from_obj, date_to_obj, category)
+            facets_json = b',"facets":' + facets_json
         
-        return {
-            "tenders": results,
-            "total": total,
-            "limit": limit,
-            "offset": offset
-        }
+        # Önceden kodlanmış ihale dizisi, jsonable_encoder'a uğramadan yanıta gömülür
+        body = (
+            b'{"tenders":' + tenders_json + f',"total":{total},"limit":{limit},"offset":{offset}'.encode()
+            + facets_json + b'}'
+        )
+        return Response(content=body, media_type="application/json", headers=headers)
     except Exception as e:
         print(f"Tender search error: {e}")
-        return {"tenders": [], "total": 0, "limit": limit, "offset": offset}
+        result = {"tenders": [], "total": 0, "limit": limit, "offset": offset}
+        if facets:
+            result["facets"] = empty_facets()
+        # Boş hata yanıtı ETag'le saklanıp sonra 304 ile geri verilmesin
+        return JSONResponse(result, headers={"Cache-Control": "no-store"})
 
-@router.post("/search", response_model=List[TenderOut])
-async def search_tenders_post(filters: TenderFilter, db: Session = Depends(get_db)):
+@router.post("/search", response_model=Union[List[TenderRow], TenderFacetPage])
+async def search_tenders_post(filters: TenderFilter):
     try:
-        results = crud.filter_tenders(
-            db=db,
-            query=filters.query,
-            source_slug=filters.source_slug,
-            date_from=filters.date_from,
-            date_to=filters.date_to,
-            limit=filters.limit,
-            offset=filters.offset,
+        version = await run_in_threadpool(read_watermark)
+        _, tenders_json = await _search(
+            version,
+            filters.query,
+            filters.source_slug,
+            filters.date_from,
+            filters.date_to,
+            filters.limit,
+            filters.offset,
+            parse_fields(filters.fields),
+            filters.snippet_len,
+            filters.category,
+        )
+        if not filters.facets:
+            return Response(content=tenders_json, media_type="application/json")
+        # Sayfa ve facet sayıları tek yanıtta; ek istek gerekmez
+        total, facets_json = await _facets(
+            version, filters.query, filters.source_slug, filters.date_from, filters.date_to, filters.category,
         )
-        return results
+        body = b'{"tenders":' + tenders_json + f',"total":{total},"facets":'.encode() + facets_json + b'}'
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         print(f"Tender search error: {e}")
+        if filters.facets:
+            return JSONResponse({"tenders": [], "total": 0, "facets": empty_facets()})
         return []
 
 
 @router.get("/sources", response_model=List[SourceOut])
-def list_sources(db: Session = Depends(get_db)):
-	return db.query(models.Source).all()
+async def list_sources(request: Request, response: Response, db: Session = Depends(get_db)):
+	version = await run_in_threadpool(read_watermark, db)
+	headers, not_modified = _cache_headers(request, version, LOOKUP_CACHE_CONTROL)
+	if not_modified:
+		return Response(status_code=304, headers=headers)
+	response.headers.update(headers)
 
+	def run() -> List[SourceOut]:
+		return [SourceOut.model_validate(s) for s in db.query(models.Source).all()]
 
-@router.post("/export.csv")
-def export_csv(filters: TenderFilter, db: Session = Depends(get_db)):
-	rows = crud.filter_tenders(
-		db=db,
+	return await sources_flight.do(None, run_in_threadpool, run)
+
+
+@router.post("/export")
+def export_tenders(filters: ExportFilter, format: Literal["csv", "ndjson"] = "csv", gzip: bool = False):
+	"""Filtrelenen ihaleleri satır sınırı olmadan, sabit bellekle akış olarak dışa aktarır"""
+	rows = iter_tender_rows(
 		query=filters.query,
 		source_slug=filters.source_slug,
 		date_from=filters.date_from,
 		date_to=filters.date_to,
 		limit=filters.limit,
 		offset=filters.offset,
+		category=filters.category,
 	)
-	buf = io.StringIO()
-	writer = csv.writer(buf)
-	writer.writerow(["id", "title", "url", "description", "published_at", "source"])
-	for t in rows:
-		writer.writerow([
-			t.id,
-			t.title,
-			t.url,
-			t.description or "",
-			(t.published_at.isoformat() if t.published_at else ""),
-			t.source.slug if t.source else "",
-		])
-	csv_bytes = buf.getvalue().encode("utf-8")
-	return Response(content=csv_bytes, media_type="text/csv", headers={
-		"Content-Disposition": "attachment; filename=tenders.csv"
+	chunks, media_type, filename = export_stream(rows, format, compress=gzip)
+	return StreamingResponse(chunks, media_type=media_type, headers={
+		"Content-Disposition": f"attachment; filename={filename}"
 	})
 
 
-@router.post("/email")
+@router.get("/changes")
+def tender_changes(
+	since: int = Query(0, ge=0),
+	limit: Optional[int] = Query(None, ge=1),
+	gzip: bool = False,
+):
+	"""since cursor'ından sonra eklenen/güncellenen ihaleleri commit sırasıyla NDJSON olarak akıtır.
+
+	Son satırdaki cursor bir sonraki isteğin since değeridir.
+	"""
+	chunks = iter_tender_changes(since, limit)
+	headers = {"Cache-Control": "no-cache"}
+	if gzip:
+		return StreamingResponse(gzip_chunks(chunks), media_type="application/gzip", headers={
+			**headers, "Content-Disposition": "attachment; filename=changes.ndjson.gz",
+		})
+	return StreamingResponse(chunks, media_type="application/x-ndjson", headers=headers)
+
+
+@router.post("/export.csv")
+def export_csv(filters: ExportFilter, gzip: bool = False):
+	return export_tenders(filters, format="csv", gzip=gzip)
+
+
+@router.post("/email", status_code=202)
 def email_results(req: EmailRequest, db: Session = Depends(get_db)):
-	rows = crud.filter_tenders(
-		db=db,
+	rows = iter_tender_rows(
 		query=req.query,
 		source_slug=req.source_slug,
 		date_from=req.date_from,
 		date_to=req.date_to,
 		limit=req.limit,
 		offset=req.offset,
+		category=req.category,
 	)
-	buf = io.StringIO()
-	writer = csv.writer(buf)
-	writer.writerow(["id", "title", "url", "description", "published_at", "source"])
-	for t in rows:
-		writer.writerow([
-			t.id,
-			t.title,
-			t.url,
-			t.description or "",
-			(t.published_at.isoformat() if t.published_at else ""),
-			t.source.slug if t.source else "",
-		])
-	send_email(
+	attachment_bytes, attachment_name = export_bytes(rows, "csv")
+	item = enqueue_mail(db, build_message(
 		subject="Ihale Sonu 7lar 3 3 3",
 		body_html="<p>Ekte filtrelenen ihaleler CSV olarak gönderildi.</p>",
 		recipient=req.recipient,
-		attachment_name="tenders.csv",
-		attachment_bytes=buf.getvalue().encode("utf-8"),
-	)
-	return {"status": "sent"}
+		attachment_name=attachment_name,
+		attachment_bytes=attachment_bytes,
+	))
+	return {"status": "queued", "outbox_id": item.id}
+
 
+@router.post("/scrape-now", status_code=202)
+def scrape_now(db: Session = Depends(get_db)):
+	"""Tarama işini kuyruğa ekler; tarama worker'ları (python -m app.worker) yürütür.
+	Bekleyen ya da çalışan bir iş varsa ona bağlanır."""
+	job, coalesced = scrape_jobs.enqueue_scrape_job(db)
+	result = {"job_id": job.id, "status": job.status, "coalesced": coalesced}
+	if not scrape_jobs.worker_alive(db):
+		result["warning"] = scrape_jobs.NO_WORKER_WARNING
+	return result
 
-@router.post("/scrape-now")
-async def scrape_now():
-	count = await trigger_scrape_once()
-	return {"inserted": count}
+
+@router.get("/scrape-jobs")
+def list_scrape_jobs(db: Session = Depends(get_db)):
+	return [scrape_jobs.job_to_dict(job) for job in scrape_jobs.list_scrape_jobs(db)]
+
+
+@router.get("/scrape-jobs/{job_id}")
+def get_scrape_job(job_id: str, db: Session = Depends(get_db)):
+	job = scrape_jobs.get_scrape_job(db, job_id)
+	if not job:
+		raise HTTPException(status_code=404, detail="Tarama işi bulunamadı")
+	return scrape_jobs.job_to_dict(job)
+
+
+@router.get("/scrape-jobs/{job_id}/events")
+async def stream_scrape_job(job_id: str, db: Session = Depends(get_db)):
+	"""Kaynak bazında tarama ilerlemesini Server-Sent Events olarak yayınlar"""
+	if not await run_in_threadpool(scrape_jobs.get_scrape_job, db, job_id):
+		raise HTTPException(status_code=404, detail="Tarama işi bulunamadı")
+
+	async def event_stream():
+		async for message in scrape_jobs.stream_scrape_job(job_id):
+			yield format_sse(message["data"], event=message["event"])
+
+	return StreamingResponse(event_stream(), media_type="text/event-stream", headers={
+		"Cache-Control": "no-cache",
+		"X-Accel-Buffering": "no",
+	})
+
+
+@router.get("/stream")
+async def stream_new_tenders(
+	request: Request,
+	query: str = None,
+	source_slug: str = None,
+	category: str = None,
+):
+	"""Yeni eklenen ihaleleri filtreye göre Server-Sent Events olarak yayınlar.
+
+	Sessiz dönemlerde heartbeat yorumu gönderilir; istemci tamponu dolarsa
+	"overflow" olayı gelir ve kaçırılanlar /changes ile tamamlanabilir.
+	"""
+	sub = tender_broker.subscribe(query=query, source_slug=source_slug, category=category)
+
+	async def event_stream():
+		try:
+			yield format_sse({"subscription": sub.id}, event="ready")
+			async for message in tender_broker.listen(sub, settings.STREAM_HEARTBEAT_SECONDS):
+				if await request.is_disconnected():
+					return
+				if message is None:
+					yield ": heartbeat\n\n"
+				else:
+					yield format_sse(message["data"], event=message["event"])
+		finally:
+			tender_broker.unsubscribe(sub)
+
+	return StreamingResponse(event_stream(), media_type="text/event-stream", headers={
+		"Cache-Control": "no-cache",
+		"X-Accel-Buffering": "no",
+	})
+
+
+@router.get("/stats")
+def tender_stats(
+	request: Request,
+	response: Response,
+	days: int = Query(90, ge=1, le=3650),
+	db: Session = Depends(get_db),
+):
+	"""Dashboard sayıları; tender_stats tablosundan okunur, tenders taranmaz"""
+	headers, not_modified = _cache_headers(request, read_watermark(db), LIST_CACHE_CONTROL, days)
+	if not_modified:
+		return Response(status_code=304, headers=headers)
+	response.headers.update(headers)
+	return crud.get_tender_stats(db, days)
+
+
+@router.get("/facets")
+def tender_facets(
+	request: Request,
+	response: Response,
+	source: Optional[List[str]] = Query(None),
+	category: Optional[List[str]] = Query(None),
+	date_from: Optional[date] = None,
+	date_to: Optional[date] = None,
+	limit: int = Query(100, ge=0, le=1000),
+	db: Session = Depends(get_db),
+):
+	"""Kaynak × kategori × ay filtresi; sayılar ve aday id'ler bitmap index'ten gelir.
+
+	Tarih filtresi ay hassasiyetindedir; category=none kategorisizleri seçer. Her facet sayısı kendi boyutu hariç
+	diğer filtreler uygulanarak hesaplanır.
+	"""
+	if not facet_index.ready:
+		raise HTTPException(status_code=503, detail=f"Facet index hazır değil: {facet_index.disabled_reason or 'kuruluyor'}")
+	version = read_watermark(db)
+	# Index başka süreçlerin eklediklerini izleyiciyle alır; ETag'deki sürüme kadar yetiştirilir
+	change_watcher.catch_up(version.change_seq)
+	headers, not_modified = _cache_headers(
+		request, version, LIST_CACHE_CONTROL,
+		sorted(source or []), sorted(category or []), date_from, date_to, limit,
+	)
+	if not_modified:
+		return Response(status_code=304, headers=headers)
+	response.headers.update(headers)
+
+	sources = db.query(models.Source).all()
+	by_slug = {s.slug: s for s in sources}
+	by_id = {str(s.id): s for s in sources}
+	filters = {
+		"source": [str(by_slug[slug].id) for slug in source if slug in by_slug] if source else None,
+		"category": ["" if c == "none" else c for c in category] if category else None,
+		"month": month_range(date_from, date_to, facet_index.values("month")) if date_from or date_to else None,
+	}
+	result = facet_index.query(filters, limit=limit)
+	facets = result["facets"]
+	return {
+		"total": result["total"],
+		"ids": result["ids"],
+		"facets": {
+			"source": sorted((
+				{"slug": by_id[key].slug if key in by_id else None,
+				 "name": by_id[key].name if key in by_id else None,
+				 "count": count}
+				for key, count in facets["source"]
+			), key=lambda f: -f["count"]),
+			"category": sorted((
+				{"category": key or None, "count": count} for key, count in facets["category"]
+			), key=lambda f: -f["count"]),
+			"month": sorted(
+				({"month": key, "count": count} for key, count in facets["month"]),
+				key=lambda f: f["month"],
+			),
+		},
+	}
 
 
 @router.get("/categories")
-def list_categories(db: Session = Depends(get_db)):
+async def list_categories(request: Request, response: Response, db: Session = Depends(get_db)):
 	"""Veritabanındaki mevcut kategorileri döndür"""
-	from sqlalchemy import distinct
+	version = await run_in_threadpool(read_watermark, db)
+	headers, not_modified = _cache_headers(request, version, LOOKUP_CACHE_CONTROL)
+	if not_modified:
+		return Response(status_code=304, headers=headers)
+	response.headers.update(headers)
+	return await categories_flight.do(None, run_in_threadpool, _load_categories, db)
+
+
+def _load_categories(db: Session) -> list[dict]:
 	from ..lib.categories import categories
 	
-	# Veritabanından mevcut kategorileri çek
-	db_categories = db.query(distinct(models.Tender.category)).filter(
-		models.Tender.category.isnot(None)
+	# Veritabanındaki kategoriler tender_stats sayaçlarından okunur (DISTINCT taraması yok)
+	db_categories = db.query(models.TenderStat.key).filter(
+		models.TenderStat.dimension == "category",
+		models.TenderStat.key != "",
+		models.TenderStat.count > 0,
 	).all()
 	
 	# Kategori listesi oluştur
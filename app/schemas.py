@@ -1,6 +1,7 @@
-from pydantic import BaseModel, HttpUrl, Field, EmailStr
+from pydantic import BaseModel, HttpUrl, Field, EmailStr, TypeAdapter, field_validator, model_validator
 from datetime import datetime
 from typing import Optional, List
+from typing_extensions import TypedDict
 
 
 class SourceOut(BaseModel):
@@ -23,6 +24,7 @@ class TenderBase(BaseModel):
 
 class TenderOut(TenderBase):
 	id: int
+	category: Optional[str] = None
 	created_at: datetime
 	source: Optional[SourceOut] = None
 
@@ -30,19 +32,123 @@ class TenderOut(TenderBase):
 		from_attributes = True
 
 
+class SourceRow(TypedDict):
+	id: int
+	name: str
+	url: str
+	slug: str
+
+
+class TenderRow(TypedDict, total=False):
+	"""TenderOut ile aynı JSON şekli; crud.search_tender_rows sözlükleri için.
+
+	Alan seçimi (fields=) yapıldığında yalnızca istenen anahtarlar bulunur.
+	"""
+	id: int
+	title: str
+	url: str
+	description: Optional[str]
+	published_at: Optional[datetime]
+	source_id: int
+	category: Optional[str]
+	created_at: datetime
+	source: Optional[SourceRow]
+
+
+# Bir kez derlenir; satırları doğrulamadan doğrudan JSON byte'larına çevirir
+TENDER_ROWS_ADAPTER = TypeAdapter(List[TenderRow])
+
+
+class SourceFacet(BaseModel):
+	slug: Optional[str] = None
+	name: Optional[str] = None
+	count: int
+
+
+class CategoryFacet(BaseModel):
+	category: Optional[str] = None
+	count: int
+
+
+class MonthFacet(BaseModel):
+	month: str
+	count: int
+
+
+class TenderFacets(BaseModel):
+	"""crud.tender_facet_counts sonucu; hata yanıtlarında listeler boştur"""
+	source: List[SourceFacet] = []
+	category: List[CategoryFacet] = []
+	month: List[MonthFacet] = []
+
+
+class TenderSearchPage(BaseModel):
+	"""GET /tenders/search yanıtı; facets yalnızca facets=true ile gelir"""
+	tenders: List[TenderRow]
+	total: int
+	limit: int
+	offset: int
+	facets: Optional[TenderFacets] = None
+
+
+class TenderFacetPage(BaseModel):
+	"""POST /tenders/search yanıtı (facets=True); aksi halde yanıt düz ihale listesidir"""
+	tenders: List[TenderRow]
+	total: int
+	facets: TenderFacets
+
+
+TENDER_FIELDS = ("id", "title", "url", "description", "published_at", "source_id", "category", "created_at", "source")
+
+
+def parse_fields(fields: Optional[List[str]]) -> Optional[tuple]:
+	"""Alan listesini doğrular ve sıralı, tekrarsız bir tuple'a çevirir (boşluklar kırpılır, boş girdiler atlanır)"""
+	fields = [f.strip() for f in fields or () if f and f.strip()]
+	if not fields:
+		return None
+	unknown = [f for f in fields if f not in TENDER_FIELDS]
+	if unknown:
+		raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+	return tuple(f for f in TENDER_FIELDS if f in fields)
+
+
 class TenderFilter(BaseModel):
 	query: Optional[str] = None
 	source_slug: Optional[str] = None
+	category: Optional[str] = None
 	date_from: Optional[datetime] = None
 	date_to: Optional[datetime] = None
 	limit: int = Field(default=100, ge=1, le=1000)
 	offset: int = Field(default=0, ge=0)
+	# Yalnızca istenen alanlar döner (id her zaman dahil); boşsa tüm alanlar
+	fields: Optional[List[str]] = None
+	# Açıklamayı veritabanında bu uzunlukta kırpar
+	snippet_len: Optional[int] = Field(default=None, ge=1, le=5000)
+	# True ise yanıt {"tenders", "total", "facets"} nesnesi olur (kaynak/kategori/ay sayıları)
+	facets: bool = False
+
+	@field_validator("fields")
+	def validate_fields(cls, v):
+		parse_fields(v)
+		return v
+
+
+class ExportFilter(BaseModel):
+	query: Optional[str] = None
+	source_slug: Optional[str] = None
+	category: Optional[str] = None
+	date_from: Optional[datetime] = None
+	date_to: Optional[datetime] = None
+	# Dışa aktarım akış olarak yapıldığı için üst sınır yok; None tüm sonuçlar demek
+	limit: Optional[int] = Field(default=None, ge=1)
+	offset: int = Field(default=0, ge=0)
 
 
 class EmailRequest(BaseModel):
 	recipient: EmailStr
 	query: Optional[str] = None
 	source_slug: Optional[str] = None
+	category: Optional[str] = None
 	date_from: Optional[datetime] = None
 	date_to: Optional[datetime] = None
 	limit: int = 100
@@ -50,6 +156,33 @@ class EmailRequest(BaseModel):
 
 
 # User schemas
+class SavedSearchCreate(BaseModel):
+	name: str = Field(min_length=1, max_length=100)
+	query: Optional[str] = Field(default=None, max_length=200)
+	source_slug: Optional[str] = None
+	category: Optional[str] = None
+
+	@model_validator(mode="after")
+	def require_filter(self):
+		if not (self.query or "").strip() and not self.source_slug and not self.category:
+			raise ValueError("En az bir filtre (query, source_slug veya category) gerekli")
+		return self
+
+
+class SavedSearchOut(BaseModel):
+	id: int
+	name: str
+	query: Optional[str] = None
+	source_slug: Optional[str] = None
+	category: Optional[str] = None
+	is_active: bool
+	created_at: datetime
+	match_count: int = 0
+
+	class Config:
+		from_attributes = True
+
+
 class UserBase(BaseModel):
 	username: str
 	email: EmailStr
@@ -0,0 +1,75 @@
+"""Bitmap facet index'i 1M sentetik ihale satırıyla ölçer.
+
+Veritabanı kullanmaz; index doğrudan üretilen satırlardan kurulur:
+
+    python -m app.scripts.bench_facet_index
+"""
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from ..services.facet_index import FacetIndex
+
+ROWS = 1_000_000
+RUNS = 20
+SOURCES = 10
+CATEGORIES = ["bilisim_teknolojileri", "insaat", "saglik", "enerji", "hizmet", "diger", None]
+MONTHS = 36
+
+
+def generate_rows():
+    rnd = random.Random(42)
+    start = datetime(2023, 1, 1)
+    minutes_per_row = MONTHS * 30 * 24 * 60 / ROWS
+    for tender_id in range(1, ROWS + 1):
+        published_at = start + timedelta(minutes=tender_id * minutes_per_row)
+        yield (
+            tender_id,
+            rnd.randint(1, SOURCES),
+            rnd.choice(CATEGORIES),
+            published_at if rnd.random() > 0.02 else None,
+        )
+
+
+def timed(fn) -> float:
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    index = FacetIndex(max_bytes=256 * 1024 * 1024)
+    index.build(generate_rows())
+    print(f"{index.rows} satır, {len(index._bits)} facet bitmap'i")
+    print(f"kurulum {index.build_ms:8.0f} ms   bellek {index.memory_bytes() / 1024 / 1024:6.1f} MiB")
+
+    months = index.values("month")[-3:]
+    queries = {
+        "filtresiz": {},
+        "bilişim": {"category": ["bilisim_teknolojileri"]},
+        "bilişim, 2 kaynak, 3 ay": {"source": ["1", "3"], "category": ["bilisim_teknolojileri"], "month": months},
+    }
+    for name, filters in queries.items():
+        result = index.query(filters, limit=100)
+        median = timed(lambda: index.query(filters, limit=100))
+        print(f"{name:<24} {result['total']:>8} sonuç   median {median:7.2f} ms")
+
+    started = time.perf_counter()
+    for tender_id in range(ROWS + 1, ROWS + 1001):
+        index.add(tender_id, 1, "bilisim_teknolojileri", datetime(2025, 12, 1))
+    print(f"1000 artımlı ekleme {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    started = time.perf_counter()
+    index.add_many(
+        (tender_id, 1, "bilisim_teknolojileri", datetime(2025, 12, 1))
+        for tender_id in range(ROWS + 1001, ROWS + 2001)
+    )
+    print(f"1000 toplu ekleme   {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
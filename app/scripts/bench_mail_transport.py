@@ -0,0 +1,107 @@
+"""Mesaj başına yeni SMTP bağlantısı ile bağlantı havuzunu yerel bir SMTP taklidine karşı ölçer.
+
+Taklit sunucu bağlantı kurulumunda (TLS + LOGIN maliyetini temsilen) ve her
+DATA komutunda gecikme uygular; gerçek mail gönderilmez:
+
+    python -m app.scripts.bench_mail_transport
+"""
+import asyncio
+import smtplib
+import socketserver
+import threading
+import time
+from email.mime.text import MIMEText
+
+from ..services.mail_transport import SMTPPool
+
+MESSAGES = 200
+CONCURRENCY = 10
+HANDSHAKE_DELAY = 0.05
+DATA_DELAY = 0.002
+
+
+class StandInHandler(socketserver.StreamRequestHandler):
+    """Yalnızca EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP ve QUIT bilen SMTP taklidi"""
+
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        time.sleep(HANDSHAKE_DELAY)
+        self.reply("220 stand-in ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                self.wfile.write(b"250-stand-in\r\n250 8BITMIME\r\n")
+            elif command.startswith(("HELO", "MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                time.sleep(DATA_DELAY)
+                self.server.received += 1
+                self.reply("250 OK queued")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class StandInServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    received = 0
+
+
+def build_message(i: int) -> MIMEText:
+    msg = MIMEText(f"<p>İhale bildirimi {i}</p>" * 20, "html", "utf-8")
+    msg["Subject"] = f"Bildirim {i}"
+    msg["From"] = "bench@example.com"
+    msg["To"] = f"user{i}@example.com"
+    return msg
+
+
+def send_unpooled(host: str, port: int, msg):
+    """Eski yol: her mesajda yeni bağlantı"""
+    with smtplib.SMTP(host, port) as server:
+        server.ehlo()
+        server.send_message(msg)
+
+
+async def run(label: str, send):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(i: int):
+        async with semaphore:
+            await send(build_message(i))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(MESSAGES)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<10} {MESSAGES / elapsed:8.1f} mesaj/sn   ({elapsed:.2f} sn)")
+
+
+async def main():
+    server = StandInServer(("127.0.0.1", 0), StandInHandler)
+    host, port = server.server_address
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"{MESSAGES} mesaj, {CONCURRENCY} eşzamanlı gönderim")
+    await run("bağlantısız", lambda msg: asyncio.to_thread(send_unpooled, host, port, msg))
+
+    pool = SMTPPool(host, port, use_tls=False, size=CONCURRENCY)
+    await run("havuz", pool.send_message)
+    print(f"havuz istatistikleri: {pool.stats()}")
+    pool.close()
+
+    assert server.received == 2 * MESSAGES, "Sunucuya ulaşan mesaj sayısı eksik"
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
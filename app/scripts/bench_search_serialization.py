@@ -0,0 +1,92 @@
+"""1000 satırlık arama yanıtı için ORM yolu ile ORM'siz hızlı yolu karşılaştırır.
+
+Geçici bir bellek içi SQLite veritabanı kullanır, data.db'ye dokunmaz:
+
+    python -m app.scripts.bench_search_serialization
+"""
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from ..db import Base
+from .. import crud, models
+from ..schemas import TenderOut, TENDER_ROWS_ADAPTER
+
+ROWS = 1000
+RUNS = 30
+
+
+def build_db() -> Session:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = Session(engine)
+    sources = [models.Source(name=f"Kaynak {i}", url=f"https://kaynak{i}.gov.tr", slug=f"kaynak{i}") for i in range(10)]
+    db.add_all(sources)
+    db.flush()
+    start = datetime(2024, 1, 1)
+    for i in range(ROWS):
+        db.add(models.Tender(
+            source_id=sources[i % len(sources)].id,
+            title=f"Bilgi işlem altyapısı alım ihalesi {i}",
+            url=f"https://kaynak.gov.tr/ihale/{i}",
+            description="Güvenlik duvarı, SIEM ve ağ anahtarı alımı. " * 8,
+            category="bilisim_teknolojileri" if i % 3 else None,
+            published_at=start + timedelta(hours=i),
+            unique_hash=f"bench-{i}",
+        ))
+    db.commit()
+    return db
+
+
+def orm_path(db: Session) -> bytes:
+    """Eski yol: ORM hidrasyonu + TenderOut(from_attributes) + jsonable_encoder"""
+    rows = crud.filter_tenders(db, None, None, None, None, ROWS, 0)
+    out = [TenderOut.model_validate(t) for t in rows]
+    return json.dumps(jsonable_encoder(out)).encode("utf-8")
+
+
+def fast_path(db: Session) -> bytes:
+    """Yeni yol: kolon seçen Core sorgusu + önceden derlenmiş TypeAdapter"""
+    rows = crud.search_tender_rows(db, None, None, None, None, ROWS, 0)
+    return TENDER_ROWS_ADAPTER.dump_json(rows)
+
+
+def measure(name: str, fn, db: Session) -> dict:
+    fn(db)  # ısınma
+    timings = []
+    for _ in range(RUNS):
+        db.expunge_all()
+        started = time.perf_counter()
+        fn(db)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    db.expunge_all()
+    tracemalloc.start()
+    fn(db)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {"median_ms": statistics.median(timings), "peak_kib": peak / 1024}
+    print(f"{name:<10} median {result['median_ms']:8.2f} ms   peak alloc {result['peak_kib']:9.1f} KiB")
+    return result
+
+
+def main():
+    db = build_db()
+    assert json.loads(orm_path(db)) == json.loads(fast_path(db)), "Yanıt şekilleri farklı"
+    print(f"{ROWS} satır, {RUNS} tekrar")
+    orm = measure("orm", orm_path, db)
+    fast = measure("fast", fast_path, db)
+    print(f"hızlanma x{orm['median_ms'] / fast['median_ms']:.1f}, "
+          f"bellek x{orm['peak_kib'] / fast['peak_kib']:.1f} daha az")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""API sürecinin açılış maliyetini ölçer: `import app.main` süresi, bellek ve ağır modüller.
+
+Ölçüm temiz bir alt süreçte yapılır; scraper'ların kullandığı selenium,
+webdriver_manager, PIL ve pytesseract API import edilirken yüklenmemelidir.
+tests/test_import_budget.py aynı ölçümü varsayılan bütçeyle yapar:
+
+    python -m app.scripts.check_import_budget --max-seconds 3 --max-rss-mb 150
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["selenium", "webdriver_manager", "PIL", "pytesseract"]
+
+# Varsayılan bütçe; CI makinelerindeki dalgalanma için ölçülenin yaklaşık iki katı
+MAX_SECONDS = 3.0
+MAX_RSS_MB = 150.0
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def measure() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE % (HEAVY_MODULES,)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    # app.main açılışta print edebilir; ölçüm son satırdadır
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS, help="import süresi üst sınırı")
+    parser.add_argument("--max-rss-mb", type=float, default=MAX_RSS_MB, help="en yüksek RSS üst sınırı (MB)")
+    args = parser.parse_args()
+
+    result = measure()
+    rss_mb = result["rss_kb"] / 1024
+    failures = 0
+
+    ok = not result["loaded"]
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} ağır modüller: {', '.join(result['loaded']) or 'yüklenmedi'}")
+
+    ok = result["seconds"] <= args.max_seconds
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} import süresi: {result['seconds']:.3f} s (sınır {args.max_seconds} s)")
+
+    ok = rss_mb <= args.max_rss_mb
+    failures += not ok
+    print(f"{'✓' if ok else '✗'} RSS: {rss_mb:.1f} MB (sınır {args.max_rss_mb} MB)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
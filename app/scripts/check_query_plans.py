@@ -0,0 +1,99 @@
+"""Arama sorgu şekillerinin migration index'lerini kullandığını EXPLAIN QUERY PLAN ile doğrular.
+
+crud fonksiyonlarının gerçekten ürettiği SQL yakalanır ve geçici bir bellek içi
+SQLite veritabanında (create_all + migration'lar) plan kontrol edilir. Aynı
+kontroller tests/test_query_plans.py'de pytest ile çalışır; bu betik planları
+okunur biçimde yazdırır:
+
+    python -m app.scripts.check_query_plans
+"""
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from .. import crud, models
+from ..migrations import init_db
+
+# (açıklama, crud çağrısı, planda beklenen index)
+CASES = [
+    ("varsayılan liste", lambda db: crud.search_tender_rows(db, None, None, None, None, 20, 0),
+     "ix_tenders_published_id"),
+    ("tarih aralığı", lambda db: crud.search_tender_rows(
+        db, None, None, datetime(2024, 1, 1), datetime(2024, 3, 1), 20, 0),
+     "ix_tenders_published_id"),
+    ("kaynak filtresi", lambda db: crud.search_tender_rows(db, None, "kaynak3", None, None, 20, 0),
+     "ix_tenders_source_published_id"),
+    ("kaynak + tarih", lambda db: crud.search_tender_rows(
+        db, None, "kaynak3", datetime(2024, 1, 1), None, 20, 0),
+     "ix_tenders_source_published_id"),
+    ("kategori filtresi", lambda db: crud.search_tender_rows(
+        db, None, None, None, None, 20, 0, category="bilisim_teknolojileri"),
+     "ix_tenders_category_published_id"),
+    ("ORM filter_tenders", lambda db: crud.filter_tenders(db, None, None, None, None, 20, 0),
+     "ix_tenders_published_id"),
+]
+
+
+def build_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    init_db(engine)
+    with Session(engine) as db:
+        sources = [models.Source(name=f"Kaynak {i}", url=f"https://k{i}", slug=f"kaynak{i}") for i in range(10)]
+        db.add_all(sources)
+        db.flush()
+        start = datetime(2023, 1, 1)
+        for i in range(5000):
+            db.add(models.Tender(
+                source_id=sources[i % 10].id,
+                title=f"İhale {i}",
+                url=f"https://k/{i}",
+                category="bilisim_teknolojileri" if i % 7 == 0 else None,
+                published_at=start + timedelta(hours=i),
+                unique_hash=f"plan-{i}",
+            ))
+        db.commit()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    return engine
+
+
+def query_plan(engine, call) -> list[str]:
+    """call'ın çalıştırdığı ilk SELECT'in EXPLAIN QUERY PLAN adımları"""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as db:
+            call(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = captured[0]
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+def uses_index(plan: list[str], expected_index: str) -> bool:
+    """Plan beklenen index'i kullanıyor ve sıralama için geçici B-tree kurmuyor mu"""
+    return any(expected_index in step for step in plan) and not any("TEMP B-TREE" in step for step in plan)
+
+
+def main() -> int:
+    engine = build_engine()
+    failures = 0
+    for name, call, expected_index in CASES:
+        plan = query_plan(engine, call)
+        ok = uses_index(plan, expected_index)
+        failures += not ok
+        print(f"{'✓' if ok else '✗'} {name}: {' | '.join(plan)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
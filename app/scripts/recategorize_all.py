@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from ..db import get_db, engine
 from ..models import Tender
+from ..crud import set_tender_category
 from ..lib.categories import classifyTender
 
 def recategorize_all_tenders():
@@ -16,8 +17,8 @@ def recategorize_all_tenders():
             old_category = tender.category
             new_category = classifyTender(tender.title, tender.description or "")
             
-            if old_category != new_category:
-                tender.category = new_category
+            # Kategori sayaçları (tender_stats) aynı transaction'da güncellenir
+            if set_tender_category(db, tender, new_category):
                 print(f"ID: {tender.id} - Eski: {old_category} -> Yeni: {new_category}")
                 print(f"Başlık: {tender.title}")
                 print("-" * 80)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import asyncio
+import itertools
+import threading
+from typing import AsyncGenerator, Dict, Optional
+
+from ..config import settings
+
+
+_ids = itertools.count(1)
+
+
+class Subscription:
+    """Tek bir istemcinin filtresi ve sınırlı tamponu.
+
+    Tampon dolarsa en eski mesaj atılır ve dropped artar; istemciye bir
+    sonraki mesajla birlikte "overflow" bildirilir, kaçırdıklarını
+    /api/tenders/changes ile tamamlayabilir.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, buffer_size: int,
+                 query: Optional[str] = None, source_slug: Optional[str] = None, category: Optional[str] = None):
+        self.id = next(_ids)
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.query = (query or "").lower() or None
+        self.source_slug = source_slug or None
+        self.category = category or None
+        self.delivered = 0
+        self.dropped = 0
+        self._reported_dropped = 0
+
+    def matches(self, tender: dict) -> bool:
+        if self.source_slug and (tender.get("source") or {}).get("slug") != self.source_slug:
+            return False
+        if self.category and tender.get("category") != self.category:
+            return False
+        if self.query:
+            text = f"{tender.get('title') or ''} {tender.get('description') or ''}".lower()
+            if self.query not in text:
+                return False
+        return True
+
+    def _put(self, message: dict):
+        """Yalnızca event loop thread'inde çağrılır"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+        self.delivered += 1
+
+    def take_overflow(self) -> int:
+        """Son bildirimden bu yana atılan mesaj sayısı"""
+        missed = self.dropped - self._reported_dropped
+        self._reported_dropped = self.dropped
+        return missed
+
+
+class TenderBroker:
+    """Süreç içi yayın/abone; ingestion yeni ihaleleri buraya yayınlar.
+
+    publish herhangi bir thread'den çağrılabilir (scraper'lar threadpool'da
+    çalışır); mesajlar abonenin event loop'una call_soon_threadsafe ile aktarılır.
+    """
+
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._subscribers: Dict[int, Subscription] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self, **filters) -> Subscription:
+        sub = Subscription(asyncio.get_running_loop(), self.buffer_size, **filters)
+        with self._lock:
+            self._subscribers[sub.id] = sub
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.pop(sub.id, None)
+
+    def publish(self, event: str, tender: dict, seq: Optional[int] = None):
+        """seq, değişiklik akışındaki sıra numarasıdır; istemci kopunca changes?since=seq ile devam eder"""
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        self.published += 1
+        message = {"event": event, "data": {"seq": seq, "tender": tender}}
+        for sub in subscribers:
+            if sub.matches(tender):
+                try:
+                    sub.loop.call_soon_threadsafe(sub._put, message)
+                except RuntimeError:
+                    # Abonenin event loop'u kapanmış
+                    self.unsubscribe(sub)
+
+    async def listen(self, sub: Subscription, heartbeat: float) -> AsyncGenerator[Optional[dict], None]:
+        """Mesajları verir; heartbeat saniye boyunca mesaj yoksa None verir"""
+        while True:
+            try:
+                message = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            missed = sub.take_overflow()
+            if missed:
+                yield {"event": "overflow", "data": {"dropped": missed}}
+            yield message
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        return {
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "delivered": sum(s.delivered for s in subscribers),
+            "dropped": sum(s.dropped for s in subscribers),
+            "buffer_size": self.buffer_size,
+        }
+
+
+tender_broker = TenderBroker(buffer_size=settings.STREAM_BUFFER_SIZE)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+import asyncio
+import threading
+from typing import Optional
+
+from .. import crud
+from ..config import settings
+from ..db import SessionLocal
+from ..schemas import TenderOut
+from .broker import tender_broker
+from .facet_index import facet_index
+
+# Tek turda okunan en fazla değişiklik
+BATCH_SIZE = 500
+
+
+class ChangeWatcher:
+    """Başka süreçlerin (tarama worker'ı) yazdığı ihaleleri API sürecine yansıtır.
+
+    tender_changes akışı CHANGE_WATCH_POLL_SECONDS aralıkla son görülen
+    seq'ten itibaren okunur. Eklenen ihaleler facet index'e eklenir ve canlı
+    akış abonelerine yayınlanır; güncellemelerde ihalenin index'teki kategorisi
+    taşınır.
+    Sorgu önbellekleri ve ETag'ler sürümü veritabanından okur (read_watermark);
+    bu turlara bağlı değildir.
+    """
+
+    def __init__(self):
+        self.last_seq = 0
+        # Arka plan turu ile istek içindeki catch_up aynı değişikliği iki kez uygulamasın
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.applied = 0
+        self.category_moves = 0
+
+    def start(self, since: int):
+        self.last_seq = since
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                applied = await asyncio.to_thread(self.poll_once)
+                if applied == BATCH_SIZE:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"✗ Değişiklik izleyici hatası: {e}")
+            await asyncio.sleep(settings.CHANGE_WATCH_POLL_SECONDS)
+
+    def catch_up(self, seq: int):
+        """seq'e kadarki değişiklikleri hemen uygular.
+
+        Bellekteki index'ten yanıt veren uç noktalar, veritabanından okudukları
+        sürümün verisini döndürsün diye çağırır; izleyici zaten yetişmişse ucuzdur.
+        """
+        while self.last_seq < seq:
+            if not self.poll_once():
+                break
+
+    def poll_once(self) -> int:
+        """Yeni değişiklikleri uygular; uygulanan değişiklik sayısını döndürür"""
+        with self._lock, SessionLocal() as db:
+            changes = crud.get_tender_changes(db, self.last_seq, BATCH_SIZE)
+            self.polls += 1
+            if not changes:
+                return 0
+            inserted = []
+            for seq, op, tender in changes:
+                if op != "insert":
+                    # Güncellemeler yalnızca kategoriyi değiştirir (set_tender_category)
+                    facet_index.move_category(tender.id, tender.category)
+                    self.category_moves += 1
+                    continue
+                inserted.append((tender.id, tender.source_id, tender.category, tender.published_at))
+                if tender_broker.has_subscribers:
+                    tender_broker.publish("tender", TenderOut.model_validate(tender).model_dump(mode="json"), seq=seq)
+            # Satırlar ihalenin güncel halidir; kategori taşımasından sonra eklemek de aynı sonucu verir
+            facet_index.add_many(inserted)
+            self.last_seq = changes[-1][0]
+            self.applied += len(changes)
+            return len(changes)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "last_seq": self.last_seq,
+            "polls": self.polls,
+            "applied": self.applied,
+            "category_moves": self.category_moves,
+        }
+
+
+change_watcher = ChangeWatcher()
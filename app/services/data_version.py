@@ -0,0 +1,34 @@
+from typing import NamedTuple, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..db import SessionLocal
+
+
+class DataWatermark(NamedTuple):
+    """Veritabanından türetilen veri sürümü.
+
+    İhale eklemeleri ve kategori güncellemeleri tender_changes'e, yeni kaynaklar
+    sources'a yazılır; ikisinin en büyük id'si birlikte veriyi tanımlar.
+    Aynı veri için tüm süreçler (uvicorn worker'ları, tarama worker'ı) aynı
+    değeri okur, bu yüzden ETag'ler süreçten bağımsızdır.
+    """
+    change_seq: int
+    source_id: int
+
+    def __str__(self) -> str:
+        return f"{self.change_seq}.{self.source_id}"
+
+
+def read_watermark(db: Optional[Session] = None) -> DataWatermark:
+    """İki MAX(id) okuması; ikisi de birincil anahtar üzerinden tek adımda yanıtlanır"""
+    stmt = select(
+        select(func.coalesce(func.max(models.TenderChange.seq), 0)).scalar_subquery(),
+        select(func.coalesce(func.max(models.Source.id), 0)).scalar_subquery(),
+    )
+    if db is not None:
+        return DataWatermark(*db.execute(stmt).one())
+    with SessionLocal() as session:
+        return DataWatermark(*session.execute(stmt).one())
@@ -0,0 +1,170 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import crud
+from ..config import settings
+from .emailer import build_message, render_tender_email
+from .mail_templates import mail_templates
+from .outbox import enqueue_envelopes
+from .query_cache import QueryCache, cached_filter_tenders
+from .data_version import read_watermark
+
+
+# manual_mail.html'in listelediği en fazla ihale
+MAX_DIGEST_TENDERS = 50
+
+# Alıcı bilgisi başlıkta görünmez; adresler yalnızca zarfta (RCPT TO) yer alır
+UNDISCLOSED_RECIPIENTS = "undisclosed-recipients:;"
+
+# Aynı filtre + konu için render edilmiş gövde; veri sürümü değişince geçersiz olur
+digest_cache = QueryCache("digests", maxsize=64, ttl=settings.QUERY_CACHE_TTL_SECONDS)
+
+
+class Digest(NamedTuple):
+    html: str
+    tender_count: int
+    # Yalnızca yeni ihale özetlerinde: özetin kapsadığı id aralığının üst sınırı
+    last_tender_id: Optional[int] = None
+
+
+def _parse_date(value) -> Optional[datetime]:
+    if not value:
+        return None
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def filters_key(filters: dict) -> tuple:
+    """Filtre sözlüğünün sıradan bağımsız, boş değerleri yok sayan anahtarı"""
+    return tuple(sorted((k, str(v)) for k, v in filters.items() if v not in (None, "")))
+
+
+def _filter_tenders(db: Session, filters: dict) -> list:
+    return cached_filter_tenders(
+        db=db,
+        query=filters.get("query"),
+        source_slug=filters.get("source_slug"),
+        date_from=_parse_date(filters.get("date_from")),
+        date_to=_parse_date(filters.get("date_to")),
+        limit=filters.get("limit", 100),
+        offset=0,
+        category=filters.get("category"),
+    )
+
+
+def _render_manual_mail(subject: str, today: str, filters: dict, tenders: list, tender_count: int) -> str:
+    filters_applied = []
+    if filters.get("query"):
+        filters_applied.append(f"Arama: {filters['query']}")
+    if filters.get("source_slug"):
+        source = next((t.source.name for t in tenders if t.source and t.source.slug == filters["source_slug"]), filters["source_slug"])
+        filters_applied.append(f"Kaynak: {source}")
+    if filters.get("date_from"):
+        filters_applied.append(f"Başlangıç: {filters['date_from']}")
+    if filters.get("date_to"):
+        filters_applied.append(f"Bitiş: {filters['date_to']}")
+
+    return mail_templates.render(
+        "manual_mail.html",
+        subject=subject,
+        current_date=today,
+        tender_count=tender_count,
+        tenders=tenders[:MAX_DIGEST_TENDERS],
+        sources_count=1 if filters.get("source_slug") else None,
+        categories_count=None,
+        filters_applied=filters_applied,
+    )
+
+
+def manual_mail_digest(db: Session, subject: str, filters: dict) -> Digest:
+    """manual_mail.html özetini filtre seti başına bir kez render eder"""
+    today = datetime.now().strftime("%d.%m.%Y")
+    key = ("manual_mail", subject, today, filters_key(filters))
+    version = read_watermark(db)
+    found, digest = digest_cache.get(key, version)
+    if found:
+        return digest
+
+    tenders = _filter_tenders(db, filters)
+    digest = Digest(_render_manual_mail(subject, today, filters, tenders, len(tenders)), len(tenders))
+    digest_cache.set(key, digest, version)
+    return digest
+
+
+def new_tenders_digest(db: Session, subject: str, filters: dict, since_id: int, until_id: int) -> Digest:
+    """(since_id, until_id] aralığında eklenen, filtreye uyan ihalelerin özeti; yeni ihale yoksa tender_count 0"""
+    today = datetime.now().strftime("%d.%m.%Y")
+    key = ("new_tenders", subject, today, filters_key(filters), since_id, until_id)
+    version = read_watermark(db)
+    found, digest = digest_cache.get(key, version)
+    if found:
+        return digest
+
+    # Sorgu sonucu konudan bağımsızdır; aynı filtre + imleç için bir kez çalışır
+    rows_key = ("new_tenders_rows", filters_key(filters), since_id, until_id)
+    found, rows = digest_cache.get(rows_key, version)
+    if not found:
+        rows = crud.new_tenders_since(
+            db,
+            since_id,
+            until_id,
+            query=filters.get("query"),
+            source_slug=filters.get("source_slug"),
+            date_from=_parse_date(filters.get("date_from")),
+            date_to=_parse_date(filters.get("date_to")),
+            category=filters.get("category"),
+            limit=MAX_DIGEST_TENDERS,
+        )
+        digest_cache.set(rows_key, rows, version)
+    tenders, total = rows
+    html = _render_manual_mail(subject, today, filters, tenders, total) if total else ""
+    digest = Digest(html, total, until_id)
+    digest_cache.set(key, digest, version)
+    return digest
+
+
+def tender_list_digest(db: Session, sender: str, subject: str, filters: dict) -> Digest:
+    """emailer.render_tender_email özetini filtre seti başına bir kez üretir"""
+    key = ("tender_list", sender, subject, datetime.now().strftime("%d.%m.%Y %H:%M"), filters_key(filters))
+    version = read_watermark(db)
+    found, digest = digest_cache.get(key, version)
+    if found:
+        return digest
+    tenders = _filter_tenders(db, filters)
+    digest = Digest(render_tender_email(sender, subject, tenders), len(tenders))
+    digest_cache.set(key, digest, version)
+    return digest
+
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def enqueue_digest(
+    db: Session,
+    subject: str,
+    html: str,
+    recipients: Iterable[str],
+    sender: Optional[str] = None,
+    attachment: Optional[Tuple[str, bytes]] = None,
+) -> List[int]:
+    """MIME mesajını bir kez kurar ve tüm alıcılara zarf bazında dağıtır.
+
+    Alıcılar MAIL_MAX_RCPT_PER_ENVELOPE'luk gruplara bölünür; her grup aynı
+    mesaj byte'larıyla tek outbox satırı (tek DATA, çok RCPT TO) olur.
+    """
+    recipients = list(dict.fromkeys(str(r) for r in recipients))
+    attachment_name, attachment_bytes = attachment or (None, None)
+    msg = build_message(
+        subject=subject,
+        body_html=html,
+        recipient=UNDISCLOSED_RECIPIENTS,
+        sender=sender,
+        attachment_name=attachment_name,
+        attachment_bytes=attachment_bytes,
+    )
+    groups = list(_chunks(recipients, settings.MAIL_MAX_RCPT_PER_ENVELOPE))
+    return [item.id for item in enqueue_envelopes(db, msg, groups)]
@@ -0,0 +1,147 @@
+from __future__ import annotations
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from .. import crud
+from ..db import SessionLocal
+
+
+EXPORT_COLUMNS = ["id", "title", "url", "description", "published_at", "source"]
+
+# Sunucu tarafı imleçten tek seferde çekilen satır ve tek parçada kodlanan satır sayısı
+FETCH_SIZE = 500
+CHUNK_ROWS = 200
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+def iter_tender_rows(
+    query: Optional[str],
+    source_slug: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    limit: Optional[int] = None,
+    offset: int = 0,
+    category: Optional[str] = None,
+) -> Iterator[tuple]:
+    """Filtreye uyan ihaleleri sunucu tarafı imleçle satır satır okur.
+
+    Kendi oturumunu açar; StreamingResponse istek bağımlılıkları kapandıktan
+    sonra da okumaya devam edebilir.
+    """
+    with SessionLocal() as db:
+        result = crud.stream_tender_export_rows(
+            db, query, source_slug, date_from, date_to,
+            limit=limit, offset=offset, category=category, yield_per=FETCH_SIZE,
+        )
+        for row in result:
+            yield tuple(row)
+
+
+CHANGE_TENDER_COLUMNS = ["id", "title", "url", "description", "category", "published_at", "source"]
+
+
+def iter_tender_changes(since: int, limit: Optional[int] = None) -> Iterator[bytes]:
+    """Değişiklik akışını NDJSON olarak üretir.
+
+    Her satır {"seq", "op", "changed_at", "tender"}; son satır kaldığı yerden
+    devam etmek için {"cursor", "count", "has_more"} içerir.
+    """
+    cursor = since
+    count = 0
+    with SessionLocal() as db:
+        result = crud.stream_tender_changes(db, since, limit, yield_per=FETCH_SIZE)
+        for chunk in _chunked(result):
+            lines = []
+            for seq, op, changed_at, *tender in chunk:
+                values = [v.isoformat() if isinstance(v, datetime) else v for v in tender]
+                lines.append(json.dumps({
+                    "seq": seq,
+                    "op": op,
+                    "changed_at": changed_at.isoformat() if changed_at else None,
+                    "tender": dict(zip(CHANGE_TENDER_COLUMNS, values)),
+                }, ensure_ascii=False))
+            cursor = chunk[-1][0]
+            count += len(chunk)
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+    has_more = limit is not None and count >= limit
+    yield (json.dumps({"cursor": cursor, "count": count, "has_more": has_more}) + "\n").encode("utf-8")
+
+
+def _export_values(row: tuple) -> list:
+    tender_id, title, url, description, published_at, source_slug = row
+    return [
+        tender_id,
+        title,
+        url,
+        description or "",
+        published_at.isoformat() if published_at else "",
+        source_slug or "",
+    ]
+
+
+def _chunked(rows: Iterable[tuple]) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_ROWS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_csv(rows: Iterable[tuple]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buf.getvalue().encode("utf-8")
+    for chunk in _chunked(rows):
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(_export_values(row) for row in chunk)
+        yield buf.getvalue().encode("utf-8")
+
+
+def iter_ndjson(rows: Iterable[tuple]) -> Iterator[bytes]:
+    for chunk in _chunked(rows):
+        lines = (
+            json.dumps(dict(zip(EXPORT_COLUMNS, _export_values(row))), ensure_ascii=False)
+            for row in chunk
+        )
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Parçaları tek bir gzip akışı olarak sıkıştırır"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(rows: Iterable[tuple], fmt: str = "csv", compress: bool = False) -> tuple[Iterator[bytes], str, str]:
+    """(parça üreteci, media type, dosya adı) döndürür"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    media_type, extension = FORMATS[fmt]
+    chunks = iter_csv(rows) if fmt == "csv" else iter_ndjson(rows)
+    filename = f"tenders.{extension}"
+    if compress:
+        return gzip_chunks(chunks), "application/gzip", f"{filename}.gz"
+    return chunks, media_type, filename
+
+
+def export_bytes(rows: Iterable[tuple], fmt: str = "csv", compress: bool = False) -> tuple[bytes, str]:
+    """Mail ekleri için dışa aktarımı bellekte toplar; (içerik, dosya adı) döndürür"""
+    chunks, _, filename = export_stream(rows, fmt, compress)
+    return b"".join(chunks), filename
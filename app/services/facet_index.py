@@ -0,0 +1,249 @@
+from __future__ import annotations
+import sys
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+
+
+# (dimension, anahtar) -> bit kümesi; ihale id'si bit konumudur
+FacetKey = Tuple[str, str]
+DIMENSIONS = ("source", "category", "month")
+
+# Artımlı eklemelerde bellek bütçesi bu kadar yeni ihalede bir denetlenir
+BUDGET_CHECK_EVERY = 256
+
+
+def month_key(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime("%Y-%m") if value else None
+
+
+def month_range(date_from: Optional[date], date_to: Optional[date], months: Iterable[str]) -> List[str]:
+    """Verilen aralığa düşen ay kovaları (ay hassasiyetinde, uçlar dahil)"""
+    low = date_from.strftime("%Y-%m") if date_from else None
+    high = date_to.strftime("%Y-%m") if date_to else None
+    return [m for m in months if (low is None or m >= low) and (high is None or m <= high)]
+
+
+def _set_bit(buf: bytearray, position: int):
+    byte_index = position >> 3
+    if byte_index >= len(buf):
+        buf.extend(bytes(byte_index - len(buf) + 1 + len(buf) // 2))
+    buf[byte_index] |= 1 << (position & 7)
+
+
+def iter_bits_desc(bits: int) -> Iterator[int]:
+    """Set edilmiş bit konumlarını büyükten küçüğe (en yeni id önce) döndürür"""
+    if not bits:
+        return
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for byte_index in range(len(data) - 1, -1, -1):
+        byte = data[byte_index]
+        while byte:
+            bit = byte.bit_length() - 1
+            yield byte_index * 8 + bit
+            byte ^= 1 << bit
+
+
+class FacetIndex:
+    """Kaynak, kategori ve ay kovaları için bellek içi bitmap index.
+
+    Her facet değeri için Python int'i bit kümesi olarak tutulur (bit i = ihale
+    id'si i). Filtreler boyut içinde OR, boyutlar arasında AND ile birleştirilir;
+    sayılar int.bit_count() ile bulunur. Toplam boyut max_bytes'ı aşarsa index
+    kapatılır ve ready False olur.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._bits: Dict[FacetKey, int] = {}
+        self._all = 0
+        self._lock = threading.Lock()
+        self.ready = False
+        self.disabled_reason: Optional[str] = None
+        self.rows = 0
+        self.build_ms = 0.0
+        self._added_since_check = 0
+
+    def build(self, rows: Iterable[Tuple[int, int, Optional[str], Optional[datetime]]]):
+        """(id, source_id, category, published_at) satırlarından index'i baştan kurar.
+
+        Kurulum sırasında bytearray'ler kullanılır; her satır için büyük int
+        kopyalamamak için int'e en sonda çevrilir.
+        """
+        started = time.perf_counter()
+        buffers: Dict[FacetKey, bytearray] = {}
+        everything = bytearray()
+        count = 0
+
+        for tender_id, source_id, category, published_at in rows:
+            _set_bit(everything, tender_id)
+            for key in self._keys(source_id, category, published_at):
+                _set_bit(buffers.setdefault(key, bytearray()), tender_id)
+            count += 1
+
+        bits = {key: int.from_bytes(buf, "little") for key, buf in buffers.items()}
+        with self._lock:
+            self._bits = bits
+            self._all = int.from_bytes(everything, "little")
+            self.rows = count
+            self.build_ms = (time.perf_counter() - started) * 1000
+            self.ready = True
+            self.disabled_reason = None
+            self._added_since_check = 0
+            self._check_budget()
+
+    def load(self, db: Session):
+        """Index'i veritabanından kurar"""
+        tender = models.Tender
+        rows = db.execute(
+            select(tender.id, tender.source_id, tender.category, tender.published_at)
+            .execution_options(yield_per=5000)
+        )
+        self.build(tuple(row) for row in rows)
+        if self.ready:
+            print(f"✓ Facet index hazır: {self.rows} ihale, {self.memory_bytes() // 1024} KiB, {self.build_ms:.0f} ms")
+
+    @staticmethod
+    def _keys(source_id: int, category: Optional[str], published_at: Optional[datetime]) -> List[FacetKey]:
+        keys = [("source", str(source_id)), ("category", category or "")]
+        month = month_key(published_at)
+        if month:
+            keys.append(("month", month))
+        return keys
+
+    def add(self, tender_id: int, source_id: int, category: Optional[str], published_at: Optional[datetime]):
+        """Yeni ihaleyi index'e ekler; index kurulmamışsa bir şey yapmaz"""
+        self.add_many([(tender_id, source_id, category, published_at)])
+
+    def add_many(self, rows: Iterable[Tuple[int, int, Optional[str], Optional[datetime]]]):
+        """(id, source_id, category, published_at) satırlarını index'e ekler.
+
+        Index'te zaten olan ihaleler atlanır (açılıştaki yükleme ile değişiklik
+        izleyicisinin tekrar okuduğu satırlar çakışabilir). Python int'leri
+        değişmez olduğundan her eklemede etkilenen bit kümeleri en büyük id
+        uzunluğunda yeniden oluşturulur; bu O(n) maliyet satır başına değil,
+        çağrı başına bir kez ödenir. Toplu eklemelerde tek çağrı yapılmalıdır.
+        """
+        if not self.ready:
+            return
+        with self._lock:
+            fresh = {row[0]: row for row in rows if not self._all >> row[0] & 1}
+            if not fresh:
+                return
+            buffers: Dict[FacetKey, bytearray] = {}
+            everything = bytearray()
+            for tender_id, source_id, category, published_at in fresh.values():
+                _set_bit(everything, tender_id)
+                for key in self._keys(source_id, category, published_at):
+                    _set_bit(buffers.setdefault(key, bytearray()), tender_id)
+            self._all |= int.from_bytes(everything, "little")
+            for key, buf in buffers.items():
+                self._bits[key] = self._bits.get(key, 0) | int.from_bytes(buf, "little")
+            self.rows += len(fresh)
+            self._added_since_check += len(fresh)
+            if self._added_since_check >= BUDGET_CHECK_EVERY:
+                self._added_since_check = 0
+                self._check_budget()
+
+    def set_category(self, tender_id: int, old: Optional[str], new: Optional[str]):
+        if not self.ready or old == new:
+            return
+        bit = 1 << tender_id
+        with self._lock:
+            old_key = ("category", old or "")
+            self._bits[old_key] = self._bits.get(old_key, 0) & ~bit
+            new_key = ("category", new or "")
+            self._bits[new_key] = self._bits.get(new_key, 0) | bit
+
+    def move_category(self, tender_id: int, category: Optional[str]):
+        """İhalenin kategorisini, önceki kategoriyi bitmap'lerden bularak günceller.
+
+        Değişiklik başka bir süreçte yapıldığında önceki kategori bilinmez;
+        kategori sayısı az olduğu için kovaları taramak tam yeniden kurulumdan ucuzdur.
+        """
+        if not self.ready:
+            return
+        bit = 1 << tender_id
+        new_key = ("category", category or "")
+        with self._lock:
+            for key, bits in self._bits.items():
+                if key[0] == "category" and key != new_key and bits & bit:
+                    self._bits[key] = bits & ~bit
+            self._bits[new_key] = self._bits.get(new_key, 0) | bit
+
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._all) + sum(sys.getsizeof(b) for b in self._bits.values())
+
+    def _check_budget(self):
+        used = self.memory_bytes()
+        if used > self.max_bytes:
+            self._bits = {}
+            self._all = 0
+            self.ready = False
+            self.disabled_reason = f"bellek bütçesi aşıldı ({used} > {self.max_bytes} bayt)"
+            print(f"⚠️ Facet index kapatıldı: {self.disabled_reason}")
+
+    def values(self, dimension: str) -> List[str]:
+        return sorted(key for dim, key in self._bits if dim == dimension)
+
+    def _union(self, dimension: str, keys: Optional[Iterable[str]]) -> int:
+        """Boyut içi OR; keys None ise boyut filtrelenmez (tüm ihaleler)"""
+        if keys is None:
+            return self._all
+        bits = 0
+        for key in keys:
+            bits |= self._bits.get((dimension, key), 0)
+        return bits
+
+    def query(self, filters: Dict[str, Optional[List[str]]], limit: int = 0) -> dict:
+        """filters: boyut -> seçili anahtarlar (None = filtre yok).
+
+        Her facet değerinin sayısı, kendi boyutu hariç diğer filtreler
+        uygulanarak hesaplanır (klasik facet davranışı).
+        """
+        with self._lock:
+            unions = {dim: self._union(dim, filters.get(dim)) for dim in DIMENSIONS}
+            candidates = self._all
+            for bits in unions.values():
+                candidates &= bits
+
+            facets: Dict[str, List[Tuple[str, int]]] = {}
+            for dim in DIMENSIONS:
+                others = self._all
+                for other, bits in unions.items():
+                    if other != dim:
+                        others &= bits
+                counts = [
+                    (key, (bits & others).bit_count())
+                    for (d, key), bits in self._bits.items() if d == dim
+                ]
+                facets[dim] = [(key, count) for key, count in counts if count]
+
+        ids = []
+        if limit:
+            for tender_id in iter_bits_desc(candidates):
+                ids.append(tender_id)
+                if len(ids) >= limit:
+                    break
+        return {"total": candidates.bit_count(), "facets": facets, "ids": ids}
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "rows": self.rows,
+            "facets": len(self._bits),
+            "memory_bytes": self.memory_bytes() if self.ready else 0,
+            "max_bytes": self.max_bytes,
+            "build_ms": round(self.build_ms, 1),
+            "disabled_reason": self.disabled_reason,
+        }
+
+
+facet_index = FacetIndex(max_bytes=settings.FACET_INDEX_MAX_BYTES)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+import json
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
+from sqlalchemy.orm import Session
+
+from .. import crud, models
+from ..config import settings
+from ..db import SessionLocal
+from .digest import enqueue_digest, filters_key, new_tenders_digest
+from .scheduler import MAIL_JOBSTORE, scheduler_service
+
+
+JOB_PREFIX = "mail_slot:"
+
+
+def schedule_slots(schedule: models.MailSchedule) -> List[str]:
+    """Planın tetiklendiği slotlar: "daily:09:00", "weekly:0:09:00", "once:2024-05-01T09:00" """
+    times = json.loads(schedule.times)
+    if schedule.schedule_type == "once":
+        return [f"once:{schedule.scheduled_date}T{t}" for t in times]
+    if schedule.schedule_type == "weekly":
+        return [f"weekly:{schedule.weekday}:{t}" for t in times]
+    return [f"daily:{t}" for t in times]
+
+
+def slot_trigger(slot: str, tz: ZoneInfo):
+    kind, _, rest = slot.partition(":")
+    if kind == "once":
+        return DateTrigger(run_date=datetime.fromisoformat(rest), timezone=tz)
+    if kind == "weekly":
+        weekday, _, rest = rest.partition(":")
+        hour, minute = map(int, rest.split(":"))
+        return CronTrigger(day_of_week=int(weekday), hour=hour, minute=minute, timezone=tz)
+    hour, minute = map(int, rest.split(":"))
+    return CronTrigger(hour=hour, minute=minute, timezone=tz)
+
+
+def slot_fire_time(slot: str, now: datetime) -> datetime:
+    """Slotun now anında ya da öncesindeki son tetiklenme zamanı (naive, yerel saat)"""
+    kind, _, rest = slot.partition(":")
+    if kind == "once":
+        return datetime.fromisoformat(rest)
+    period = timedelta(days=1)
+    if kind == "weekly":
+        weekday, _, rest = rest.partition(":")
+        period = timedelta(days=7)
+    fire = datetime.combine(now.date(), time.fromisoformat(rest))
+    if kind == "weekly":
+        fire -= timedelta(days=(now.weekday() - int(weekday)) % 7)
+    return fire if fire <= now else fire - period
+
+
+class MailScheduler:
+    """Zamanlanmış özet maillerini APScheduler üzerinden çalıştırır.
+
+    Planlar mail_schedules tablosunda tutulur. APScheduler'da plan başına
+    değil, tetiklenme slotu (gün/saat) başına tek iş vardır ve bu işler
+    SQLAlchemy job store'da saklanır. Slot tetiklendiğinde o slottaki planlar
+    veritabanında talep edilir, filtre imzası ve alıcı imlecine göre gruplanır;
+    her grup için yalnızca imleçten yeni ihaleler bir kez sorgulanıp render
+    edilir, alıcılar aynı mesajı paylaşır ve imleçleri ilerletilir.
+    """
+
+    def __init__(self):
+        self.tz = ZoneInfo(settings.MAIL_SCHEDULE_TIMEZONE)
+        self.runs = 0
+        self.schedules_sent = 0
+        self.renders = 0
+
+    @property
+    def scheduler(self):
+        return scheduler_service.scheduler
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz).replace(tzinfo=None)
+
+    def sync(self, db: Session):
+        """Aktif planların slotlarını job store'daki işlerle eşitler"""
+        now = self.now()
+        grace = timedelta(seconds=settings.MAIL_SCHEDULE_MISFIRE_SECONDS)
+        wanted = set()
+        for schedule in crud.get_mail_schedules(db, active_only=True):
+            for slot in schedule_slots(schedule):
+                # Geçmişte kalmış tek seferlik slotlar için iş açılmaz
+                if slot.startswith("once:") and slot_fire_time(slot, now) + grace < now:
+                    continue
+                wanted.add(JOB_PREFIX + slot)
+
+        existing = {job.id for job in self.scheduler.get_jobs(jobstore=MAIL_JOBSTORE)}
+        for job_id in wanted - existing:
+            self.scheduler.add_job(
+                "app.services.mail_scheduler:run_mail_slot",
+                trigger=slot_trigger(job_id[len(JOB_PREFIX):], self.tz),
+                args=[job_id[len(JOB_PREFIX):]],
+                id=job_id,
+                jobstore=MAIL_JOBSTORE,
+                replace_existing=True,
+                coalesce=True,
+                misfire_grace_time=settings.MAIL_SCHEDULE_MISFIRE_SECONDS,
+            )
+        for job_id in existing - wanted:
+            self.scheduler.remove_job(job_id, jobstore=MAIL_JOBSTORE)
+
+    def next_run(self, schedule: models.MailSchedule) -> Optional[datetime]:
+        if not schedule.is_active or not self.scheduler.running:
+            return None
+        times = []
+        for slot in schedule_slots(schedule):
+            job = self.scheduler.get_job(JOB_PREFIX + slot, jobstore=MAIL_JOBSTORE)
+            if job is not None and job.next_run_time is not None:
+                times.append(job.next_run_time.astimezone(self.tz).replace(tzinfo=None))
+        return min(times) if times else None
+
+    def run_slot(self, slot: str):
+        fire_time = slot_fire_time(slot, self.now())
+        with SessionLocal() as db:
+            candidates = [s.id for s in crud.get_mail_schedules(db, active_only=True) if slot in schedule_slots(s)]
+            schedules = crud.claim_mail_schedules(db, candidates, fire_time)
+            if not schedules:
+                return
+            cursors = crud.get_delivery_cursors(db, [s.id for s in schedules])
+            # Bu turun kesim noktası; tüm gruplar aynı (imleç, until] aralığını okur
+            until_id = crud.max_tender_id(db)
+
+            # (filtre imzası, imleç) -> (konu, gönderen) -> [(plan id, alıcı)]
+            groups: Dict[tuple, Dict[Tuple[str, str], List[Tuple[int, str]]]] = defaultdict(lambda: defaultdict(list))
+            filters_by_key: Dict[tuple, dict] = {}
+            for schedule in schedules:
+                filters = json.loads(schedule.filters or "{}")
+                key = filters_key(filters)
+                filters_by_key[key] = filters
+                for recipient in json.loads(schedule.recipients):
+                    # İmleci olmayan alıcı bu andan itibaren takip edilir
+                    cursor = cursors.get((schedule.id, recipient), until_id)
+                    groups[(key, cursor)][(schedule.subject, schedule.sender_email)].append((schedule.id, recipient))
+                if schedule.schedule_type == "once" and slot == max(schedule_slots(schedule)):
+                    schedule.is_active = False
+            db.commit()
+
+            for (key, cursor), envelopes in groups.items():
+                for (subject, sender), deliveries in envelopes.items():
+                    digest = new_tenders_digest(db, subject, filters_by_key[key], cursor, until_id)
+                    # İmleç ilerlemesi outbox kaydıyla aynı commit'te yazılır
+                    crud.advance_delivery_cursors(db, deliveries, until_id, datetime.utcnow())
+                    if not digest.tender_count:
+                        # Yeni ihale yok; mail gönderilmez
+                        db.commit()
+                        continue
+                    enqueue_digest(
+                        db, subject=subject, html=digest.html,
+                        recipients=[recipient for _, recipient in deliveries], sender=sender,
+                    )
+                    self.renders += 1
+            self.runs += 1
+            self.schedules_sent += len(schedules)
+            print(f"✓ Mail slotu {slot}: {len(schedules)} plan, {len(groups)} sorgu grubu")
+
+    def stats(self) -> dict:
+        return {
+            "jobs": len(self.scheduler.get_jobs(jobstore=MAIL_JOBSTORE)) if self.scheduler.running else 0,
+            "runs": self.runs,
+            "schedules_sent": self.schedules_sent,
+            "renders": self.renders,
+        }
+
+
+mail_scheduler = MailScheduler()
+
+
+def run_mail_slot(slot: str):
+    """APScheduler işi; job store'a metin referansıyla kaydedilir"""
+    mail_scheduler.run_slot(slot)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
+
+from ..config import settings
+
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "email_templates")
+
+
+class TemplateRegistry:
+    """Tüm mail şablonları için tek, paylaşılan Jinja ortamı.
+
+    Şablonlar bir kez derlenip bellekte tutulur; derlenmiş bytecode diske
+    yazıldığı için yeniden başlatmada parse/compile adımı atlanır. HTML
+    şablonlarında autoescape açıktır. Render süreleri şablon bazında tutulur.
+    """
+
+    def __init__(self, directory: str, cache_dir: Optional[str] = None, auto_reload: bool = False):
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.env = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(["html", "xml"]),
+            bytecode_cache=FileSystemBytecodeCache(cache_dir),
+            auto_reload=auto_reload,
+            cache_size=-1,
+        )
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, float]] = {}
+        self.preloaded = 0
+        self.preload_ms = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "TemplateRegistry":
+        return cls(
+            TEMPLATE_DIR,
+            cache_dir=settings.MAIL_TEMPLATE_CACHE_DIR,
+            auto_reload=settings.MAIL_TEMPLATE_AUTO_RELOAD,
+        )
+
+    def preload(self) -> int:
+        """Dizindeki tüm şablonları derleyip önbelleğe alır"""
+        started = time.perf_counter()
+        names = self.env.list_templates(extensions=["html"])
+        for name in names:
+            self.env.get_template(name)
+        self.preloaded = len(names)
+        self.preload_ms = (time.perf_counter() - started) * 1000
+        return self.preloaded
+
+    def get(self, name: str) -> Template:
+        return self.env.get_template(name)
+
+    def render(self, name: str, **context) -> str:
+        started = time.perf_counter()
+        html = self.env.get_template(name).render(**context)
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            metric = self._metrics.setdefault(name, {"renders": 0, "total_ms": 0.0, "max_ms": 0.0})
+            metric["renders"] += 1
+            metric["total_ms"] += elapsed
+            metric["max_ms"] = max(metric["max_ms"], elapsed)
+        return html
+
+    def stats(self) -> dict:
+        with self._lock:
+            templates = {
+                name: {
+                    "renders": int(m["renders"]),
+                    "avg_ms": round(m["total_ms"] / m["renders"], 3),
+                    "max_ms": round(m["max_ms"], 3),
+                }
+                for name, m in self._metrics.items()
+            }
+        return {
+            "preloaded": self.preloaded,
+            "preload_ms": round(self.preload_ms, 2),
+            "templates": templates,
+        }
+
+
+mail_templates = TemplateRegistry.from_settings()
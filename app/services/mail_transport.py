@@ -0,0 +1,231 @@
+from __future__ import annotations
+import asyncio
+import queue
+import smtplib
+import threading
+import time
+from email.message import Message
+from typing import List, Optional, Tuple
+
+from ..config import settings
+
+
+# smtplib.SMTPException de OSError alt sınıfıdır; yalnızca bağlantının kopması
+# yeniden bağlanıp tekrar göndermeyi gerektirir. Sunucu yanıtları (421, 5xx,
+# reddedilen alıcılar) tekrar gönderilmez.
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError)
+
+class SMTPPool:
+    """Oturum açılmış, tekrar kullanılan SMTP bağlantılarından küçük bir havuz.
+
+    Her mesajda yeni bağlantı + STARTTLS + LOGIN yapmak yerine boşta bekleyen
+    bağlantı alınır. Boşta max_idle saniyeden uzun kalan bağlantı kapatılır,
+    diğerleri kullanılmadan önce NOOP ile denetlenir. Gönderim sırasında
+    bağlantı koparsa yeni bağlantıyla bir kez daha denenir.
+
+    smtplib senkron olduğu için async API gönderimi thread'de çalıştırır;
+    event loop bloklanmaz.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        size: int = 3,
+        max_idle: float = 60,
+        timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        # (bağlantı, boşa çıkış zamanı); LIFO, en son kullanılan (en sıcak) önce
+        self._idle: "queue.LifoQueue[Tuple[smtplib.SMTP, float]]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.reuses = 0
+        self.reconnects = 0
+        self.sent = 0
+        self.failures = 0
+
+    @classmethod
+    def from_settings(cls) -> "SMTPPool":
+        return cls(
+            host=settings.SMTP_SERVER,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USERNAME,
+            password=settings.SMTP_PASSWORD,
+            use_tls=settings.SMTP_USE_TLS,
+            size=settings.SMTP_POOL_SIZE,
+            max_idle=settings.SMTP_POOL_MAX_IDLE_SECONDS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+        )
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.ehlo()
+            if self.use_tls:
+                conn.starttls()
+                conn.ehlo()
+            if self.username and self.password:
+                conn.login(self.username, self.password)
+        except Exception:
+            self._close(conn)
+            raise
+        with self._lock:
+            self.connects += 1
+        return conn
+
+    @staticmethod
+    def _close(conn: smtplib.SMTP):
+        try:
+            conn.quit()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _healthy(self, conn: smtplib.SMTP, idle_since: float) -> bool:
+        if time.monotonic() - idle_since > self.max_idle:
+            return False
+        try:
+            return conn.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _acquire(self) -> smtplib.SMTP:
+        while True:
+            try:
+                conn, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if self._healthy(conn, idle_since):
+                with self._lock:
+                    self.reuses += 1
+                return conn
+            self._close(conn)
+
+    def _release(self, conn: smtplib.SMTP):
+        # 421 yanıtında smtplib bağlantıyı kendisi kapatır; kapalı bağlantı havuza dönmez
+        if conn.sock is None:
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    def send_message_sync(self, msg: Message, from_addr: Optional[str] = None, to_addrs: Optional[List[str]] = None) -> dict:
+        """Mesajı havuzdaki bir bağlantıyla gönderir; reddedilen alıcıları döndürür"""
+        with self._slots:
+            conn = self._acquire()
+            try:
+                refused = conn.send_message(msg, from_addr=from_addr, to_addrs=to_addrs)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # Oturum hâlâ geçerli; bağlantı havuza döner
+                self._release(conn)
+                with self._lock:
+                    self.failures += 1
+                raise
+            except RECONNECT_ERRORS:
+                # Bağlantı sunucu tarafından kapatılmış; yenisiyle bir kez daha dene
+                self._close(conn)
+                with self._lock:
+                    self.reconnects += 1
+                conn = self._connect()
+                try:
+                    refused = conn.send_message(msg, from_addr=from_addr, to_addrs=to_addrs)
+                except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                    self._release(conn)
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                except Exception:
+                    self._close(conn)
+                    with self._lock:
+                        self.failures += 1
+                    raise
+            except Exception:
+                self._close(conn)
+                with self._lock:
+                    self.failures += 1
+                raise
+            self._release(conn)
+            with self._lock:
+                self.sent += 1
+            return refused
+
+    def send_batch_sync(self, envelopes: List[Tuple[Message, Optional[List[str]]]]) -> List[Optional[Exception]]:
+        """(mesaj, alıcılar) çiftlerini tek bağlantı üzerinden sırayla gönderir.
+
+        Mesaj başına hata (ya da None) döndürür; bir mesajın reddi diğerlerini durdurmaz.
+        """
+        results: List[Optional[Exception]] = []
+        with self._slots:
+            conn: Optional[smtplib.SMTP] = None
+            for msg, to_addrs in envelopes:
+                try:
+                    if conn is None:
+                        conn = self._acquire()
+                    try:
+                        conn.send_message(msg, to_addrs=to_addrs)
+                    except RECONNECT_ERRORS:
+                        self._close(conn)
+                        conn = None
+                        with self._lock:
+                            self.reconnects += 1
+                        conn = self._connect()
+                        conn.send_message(msg, to_addrs=to_addrs)
+                except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+                    # Bu mesaj reddedildi; oturum geçerliyse sıradakiyle aynı bağlantıdan devam
+                    if conn is not None and conn.sock is None:
+                        conn = None
+                    results.append(e)
+                    with self._lock:
+                        self.failures += 1
+                    continue
+                except Exception as e:
+                    if conn is not None:
+                        self._close(conn)
+                        conn = None
+                    results.append(e)
+                    with self._lock:
+                        self.failures += 1
+                    continue
+                results.append(None)
+                with self._lock:
+                    self.sent += 1
+            if conn is not None:
+                self._release(conn)
+        return results
+
+    async def send_message(self, msg: Message, from_addr: Optional[str] = None, to_addrs: Optional[List[str]] = None) -> dict:
+        return await asyncio.to_thread(self.send_message_sync, msg, from_addr, to_addrs)
+
+    def close(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "connects": self.connects,
+            "reuses": self.reuses,
+            "reconnects": self.reconnects,
+            "sent": self.sent,
+            "failures": self.failures,
+        }
+
+
+mail_transport = SMTPPool.from_settings()
@@ -0,0 +1,215 @@
+from __future__ import annotations
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from email import message_from_bytes
+from email.message import Message
+from typing import List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+from ..db import SessionLocal
+from .mail_transport import mail_transport
+
+
+def enqueue_mail(db: Session, msg: Message, to_addrs: Optional[List[str]] = None) -> models.MailOutbox:
+    """Hazır mesajı outbox'a yazar ve commit eder; gönderim worker'a kalır"""
+    recipients = to_addrs or [addr.strip() for addr in (msg.get("To") or "").split(",") if addr.strip()]
+    return enqueue_envelopes(db, msg, [recipients])[0]
+
+
+def enqueue_envelopes(
+    db: Session, msg: Message, recipient_groups: List[List[str]], commit: bool = True,
+) -> List[models.MailOutbox]:
+    """Aynı mesajı her alıcı grubu için bir zarf olarak outbox'a yazar.
+
+    Mesaj bir kez serileştirilir; tüm satırlar aynı byte'ları paylaşır ve
+    tek commit'le eklenir. commit=False ise satırlar çağıranın transaction'ına
+    eklenir; commit sonrası outbox_worker.wake() çağıranın işidir.
+    """
+    payload = msg.as_bytes()
+    now = datetime.utcnow()
+    items = [
+        models.MailOutbox(
+            status="pending",
+            sender=msg.get("From"),
+            recipients=json.dumps(recipients),
+            subject=msg.get("Subject"),
+            message=payload,
+            next_attempt_at=now,
+        )
+        for recipients in recipient_groups
+        if recipients
+    ]
+    db.add_all(items)
+    if not commit:
+        db.flush()
+        return items
+    db.commit()
+    for item in items:
+        db.refresh(item)
+    outbox_worker.wake()
+    return items
+
+
+def retry_delay(attempts: int) -> float:
+    """attempts. başarısız denemeden sonra beklenecek süre (üstel, %20 sapmalı)"""
+    delay = settings.OUTBOX_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def outbox_counts(db: Session) -> dict:
+    rows = db.execute(select(models.MailOutbox.status, func.count()).group_by(models.MailOutbox.status)).all()
+    return {status: count for status, count in rows}
+
+
+class OutboxWorker:
+    """mail_outbox tablosunu boşaltan arka plan görevi.
+
+    Token bucket ile dakikada OUTBOX_RATE_PER_MINUTE gönderimi aşmaz; her
+    turda en fazla OUTBOX_BATCH_SIZE maili tek SMTP bağlantısı üzerinden
+    gönderir. Talep edilen satırlar "sending" durumuna alınır; süreç bu
+    sırada çökerse OUTBOX_LEASE_SECONDS sonra yeniden "pending" olur (her
+    OUTBOX_POLL_SECONDS'ta kontrol edilir, diğer süreçlerin worker'ları da
+    geri alabilir).
+    """
+
+    def __init__(self):
+        self.rate_per_second = settings.OUTBOX_RATE_PER_MINUTE / 60
+        self.capacity = settings.OUTBOX_BATCH_SIZE
+        self._tokens = float(self.capacity)
+        self._refilled_at = time.monotonic()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+
+    def start(self):
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def wake(self):
+        """Yeni mail eklendi; worker bekliyorsa hemen uyansın (her thread'den çağrılabilir)"""
+        if self._task is not None and self._wake is not None:
+            self._task.get_loop().call_soon_threadsafe(self._wake.set)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * self.rate_per_second)
+        self._refilled_at = now
+
+    async def _run(self):
+        next_release = 0.0
+        while True:
+            try:
+                # Çöken gönderimlerin (bu ya da başka bir süreçte) lease'leri düzenli geri alınır
+                if time.monotonic() >= next_release:
+                    await asyncio.to_thread(self._release_expired_leases)
+                    next_release = time.monotonic() + settings.OUTBOX_POLL_SECONDS
+                self._refill()
+                if self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+                    continue
+                sent = await asyncio.to_thread(self._drain_once, int(self._tokens))
+                self._tokens -= sent
+                if sent:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"✗ Outbox worker hatası: {e}")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def _release_expired_leases(self):
+        """Çöken bir gönderimden "sending" durumunda kalan satırları geri alır"""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        with SessionLocal() as db:
+            db.execute(
+                update(models.MailOutbox)
+                .where(models.MailOutbox.status == "sending", models.MailOutbox.next_attempt_at < cutoff)
+                .values(status="pending")
+            )
+            db.commit()
+
+    def _claim(self, db: Session, limit: int) -> List[models.MailOutbox]:
+        now = datetime.utcnow()
+        items = db.execute(
+            select(models.MailOutbox)
+            .where(models.MailOutbox.status == "pending", models.MailOutbox.next_attempt_at <= now)
+            .order_by(models.MailOutbox.next_attempt_at, models.MailOutbox.id)
+            .limit(limit)
+        ).scalars().all()
+        claimed = []
+        for item in items:
+            # Koşullu güncelleme: başka bir worker aynı satırı aldıysa atla
+            taken = db.execute(
+                update(models.MailOutbox)
+                .where(models.MailOutbox.id == item.id, models.MailOutbox.status == "pending")
+                # "sending" iken next_attempt_at talep zamanıdır (lease kontrolü için)
+                .values(status="sending", next_attempt_at=now)
+            ).rowcount
+            if taken:
+                claimed.append(item)
+        db.commit()
+        return claimed
+
+    def _drain_once(self, limit: int) -> int:
+        """Bir tur gönderim yapar; denenen mail sayısını döndürür"""
+        with SessionLocal() as db:
+            items = self._claim(db, min(limit, self.capacity))
+            if not items:
+                return 0
+            envelopes = [(message_from_bytes(item.message), json.loads(item.recipients)) for item in items]
+            results = mail_transport.send_batch_sync(envelopes)
+            now = datetime.utcnow()
+            for item, error in zip(items, results):
+                if error is None:
+                    item.status = "sent"
+                    item.sent_at = now
+                    item.last_error = None
+                    self.sent += 1
+                    continue
+                item.attempts += 1
+                item.last_error = str(error)
+                if item.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    item.status = "dead"
+                    self.dead += 1
+                    print(f"✗ Mail {item.id} gönderilemedi, dead-letter'a alındı: {error}")
+                else:
+                    item.status = "pending"
+                    item.next_attempt_at = now + timedelta(seconds=retry_delay(item.attempts))
+                    self.retried += 1
+            db.commit()
+            return len(items)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "rate_per_minute": settings.OUTBOX_RATE_PER_MINUTE,
+            "tokens": round(self._tokens, 2),
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead": self.dead,
+        }
+
+
+outbox_worker = OutboxWorker()
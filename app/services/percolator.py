@@ -0,0 +1,145 @@
+from __future__ import annotations
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models
+
+
+# Sorgular en az bu uzunlukta ise n-gram kovasına yerleşir; daha kısalar her ihalede denenir
+GRAM = 3
+
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def fold_text(text: str) -> str:
+    """/search'teki lower(kolon) LIKE ile aynı: SQLite yalnızca ASCII harfleri küçültür"""
+    return text.translate(_ASCII_LOWER)
+
+
+def fold_query(query: str) -> str:
+    """/search sorguyu Python'da küçültür (crud._filter_params)"""
+    return fold_text(query.lower())
+
+
+def grams(text: str) -> Set[str]:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class CompiledSearch(NamedTuple):
+    id: int
+    query: Optional[str]  # fold_query ile katlanmış
+    source_slug: Optional[str]
+    category: Optional[str]
+
+    def matches(self, title: str, description: str, source_slug: Optional[str], category: Optional[str]) -> bool:
+        # /search ile aynı anlam: sorgu başlıkta ya da açıklamada alt dizi olarak geçer
+        return (
+            (not self.query or self.query in title or self.query in description)
+            and (not self.source_slug or self.source_slug == source_slug)
+            and (not self.category or self.category == category)
+        )
+
+
+class SavedSearchIndex:
+    """Kayıtlı aramalar için ters index (percolator).
+
+    Her arama tek bir anahtar altında tutulur: sorgusu varsa sorgunun bir
+    3-gram'ı, yoksa kategori ya da kaynağı. Sorgu ihalede alt dizi olarak
+    geçiyorsa tüm 3-gram'ları da geçer; bu yüzden yeni ihalenin 3-gram'ları,
+    kaynağı ve kategorisiyle yalnızca ilgili kovalar okunur ve adaylar tam
+    koşulla (alt dizi + kaynak + kategori) doğrulanır. Eşleşme /search'teki
+    LIKE '%sorgu%' ile aynıdır; "bilgi" araması "bilgisayar"ı da bulur.
+    """
+
+    def __init__(self):
+        self._by_gram: Dict[str, List[CompiledSearch]] = {}
+        self._short: List[CompiledSearch] = []
+        self._by_category: Dict[str, List[CompiledSearch]] = {}
+        self._by_source: Dict[str, List[CompiledSearch]] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.searches = 0
+        self.percolated = 0
+        self.candidates = 0
+        self.matched = 0
+
+    def invalidate(self):
+        """Kayıtlı aramalar değişti; bir sonraki eşleştirmede yeniden yüklenir"""
+        with self._lock:
+            self._loaded = False
+
+    def _load(self, db: Session):
+        by_gram: Dict[str, List[CompiledSearch]] = {}
+        short: List[CompiledSearch] = []
+        by_category: Dict[str, List[CompiledSearch]] = {}
+        by_source: Dict[str, List[CompiledSearch]] = {}
+        rows = db.execute(
+            select(models.SavedSearch).where(models.SavedSearch.is_active.is_(True))
+        ).scalars().all()
+        for row in rows:
+            query = fold_query(row.query or "") or None
+            compiled = CompiledSearch(row.id, query, row.source_slug or None, row.category or None)
+            if query and len(query) >= GRAM:
+                # En az kovaya düşmesi için o ana kadar en az kullanılan 3-gram seçilir
+                anchor = min(sorted(grams(query)), key=lambda g: len(by_gram.get(g, ())))
+                by_gram.setdefault(anchor, []).append(compiled)
+            elif query:
+                short.append(compiled)
+            elif compiled.category:
+                by_category.setdefault(compiled.category, []).append(compiled)
+            elif compiled.source_slug:
+                by_source.setdefault(compiled.source_slug, []).append(compiled)
+        self._by_gram, self._short = by_gram, short
+        self._by_category, self._by_source = by_category, by_source
+        self.searches = len(rows)
+        self._loaded = True
+
+    def match(
+        self,
+        db: Session,
+        title: str,
+        description: Optional[str],
+        source_slug: Optional[str],
+        category: Optional[str],
+    ) -> List[int]:
+        """İhaleyle eşleşen kayıtlı arama id'leri"""
+        with self._lock:
+            if not self._loaded:
+                self._load(db)
+            if not self.searches:
+                return []
+            title, description = fold_text(title or ""), fold_text(description or "")
+            text_grams = grams(title) | grams(description)
+            buckets: List[Iterable[CompiledSearch]] = [self._by_gram.get(g, ()) for g in text_grams]
+            buckets.append(self._short)
+            if category:
+                buckets.append(self._by_category.get(category, ()))
+            if source_slug:
+                buckets.append(self._by_source.get(source_slug, ()))
+
+            matched = []
+            for bucket in buckets:
+                for search in bucket:
+                    self.candidates += 1
+                    if search.matches(title, description, source_slug, category):
+                        matched.append(search.id)
+            self.percolated += 1
+            self.matched += len(matched)
+            return matched
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "searches": self.searches,
+            "grams": len(self._by_gram),
+            "percolated": self.percolated,
+            "candidates": self.candidates,
+            "matched": self.matched,
+        }
+
+
+saved_search_index = SavedSearchIndex()
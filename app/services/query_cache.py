@@ -0,0 +1,230 @@
+from __future__ import annotations
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import crud
+from ..config import settings
+from ..db import SessionLocal
+from ..schemas import TenderOut, TENDER_ROWS_ADAPTER
+from .data_version import DataWatermark, read_watermark
+
+
+class QueryCache:
+    """Veri sürümüyle anahtarlanan LRU/TTL sonuç önbelleği.
+
+    Sürüm, çağıranın istek başında veritabanından okuduğu read_watermark()
+    değeridir. Tarama worker'ı gibi başka bir süreç ihale eklediğinde sonraki
+    istek yeni sürümü okur, eski sonuçlar bir daha okunmaz; LRU ile zamanla
+    dışarı atılırlar.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: DataWatermark) -> Tuple[bool, Any]:
+        full_key = (key, version)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[full_key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(full_key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: Hashable, value: Any, version: DataWatermark):
+        """version, sonucu üretmeden önce okunan veri sürümüdür.
+
+        Sorgu sırasında veri değiştiyse sonuç eski sürüme yazılır ve hiç okunmaz.
+        """
+        full_key = (key, version)
+        with self._lock:
+            self._entries[full_key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+tender_query_cache = QueryCache(
+    "tenders",
+    maxsize=settings.QUERY_CACHE_MAX_ENTRIES,
+    ttl=settings.QUERY_CACHE_TTL_SECONDS,
+)
+
+
+def filter_key(
+    query: Optional[str],
+    source_slug: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    limit: int,
+    offset: int,
+    category: Optional[str] = None,
+) -> tuple:
+    """crud.filter_tenders ile aynı sonucu veren filtreler için aynı anahtarı üretir"""
+    # Sorgu küçük harfe çevrilerek aranır, boş değerler filtre uygulanmamış sayılır
+    return ((query or "").lower() or None, source_slug or None, date_from, date_to, limit, offset, category or None)
+
+
+def cached_filter_tenders(
+    db: Session,
+    query: Optional[str],
+    source_slug: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    limit: int,
+    offset: int,
+    category: Optional[str] = None,
+) -> List[TenderOut]:
+    """crud.filter_tenders sonucunu önbellekten döndürür; yoksa sorgulayıp saklar.
+
+    Dönen liste paylaşılır, çağıranlar üzerinde değişiklik yapmamalıdır.
+    """
+    version = read_watermark(db)
+    key = filter_key(query, source_slug, date_from, date_to, limit, offset, category)
+    found, value = tender_query_cache.get(key, version)
+    if found:
+        return value
+    return load_filter_tenders(db, version, query, source_slug, date_from, date_to, limit, offset, category)
+
+
+def load_filter_tenders(
+    db: Session,
+    version: DataWatermark,
+    query: Optional[str],
+    source_slug: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    limit: int,
+    offset: int,
+    category: Optional[str] = None,
+) -> List[TenderOut]:
+    """Önbelleğe bakmadan sorgular ve sonucu version altında önbelleğe yazar"""
+    rows = crud.filter_tenders(
+        db=db,
+        query=query,
+        source_slug=source_slug,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        offset=offset,
+        category=category,
+    )
+    result = [TenderOut.model_validate(t) for t in rows]
+    key = filter_key(query, source_slug, date_from, date_to, limit, offset, category)
+    tender_query_cache.set(key, result, version=version)
+    return result
+
+
+def tender_list_json_key(
+    query: Optional[str],
+    source_slug: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    limit: int,
+    offset: int,
+    fields: Optional[tuple] = None,
+    snippet_len: Optional[int] = None,
+    category: Optional[str] = None,
+) -> tuple:
+    return ("json", fields, snippet_len) + filter_key(query, source_slug, date_from, date_to, limit, offset, category)
+
+
+def load_tender_list_json(
+    version: DataWatermark,
+    query: Optional[str],
+    source_slug: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    limit: int,
+    offset: int,
+    fields: Optional[tuple] = None,
+    snippet_len: Optional[int] = None,
+    category: Optional[str] = None,
+) -> Tuple[int, bytes]:
+    """ORM'siz sorgunun sonucunu JSON byte'ları olarak üretir ve önbelleğe yazar.
+
+    (satır sayısı, JSON dizi byte'ları) döndürür. Kendi oturumunu açar;
+    single-flight ile paylaşılan hesaplama, isteği başlatan istemci kopup
+    istek oturumu kapansa da diğer bekleyenler için sürer. version, çağıranın
+    sorgudan önce okuduğu veri sürümüdür.
+    """
+    with SessionLocal() as db:
+        rows = crud.search_tender_rows(
+            db=db,
+            query=query,
+            source_slug=source_slug,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+            offset=offset,
+            fields=fields,
+            snippet_len=snippet_len,
+            category=category,
+        )
+    result = (len(rows), TENDER_ROWS_ADAPTER.dump_json(rows))
+    key = tender_list_json_key(query, source_slug, date_from, date_to, limit, offset, fields, snippet_len, category)
+    tender_query_cache.set(key, result, version=version)
+    return result
+
+
+def tender_facets_key(
+    query: Optional[str],
+    source_slug: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    category: Optional[str] = None,
+) -> tuple:
+    # Sayfalamadan bağımsızdır; sayfa değiştirmek sayıları yeniden hesaplatmaz
+    return ("facets",) + filter_key(query, source_slug, date_from, date_to, None, None, category)
+
+
+def load_tender_facets(
+    version: DataWatermark,
+    query: Optional[str],
+    source_slug: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    category: Optional[str] = None,
+) -> Tuple[int, bytes]:
+    """Facet sayılarını kendi oturumuyla hesaplar ve version altında önbelleğe yazar; (kesin toplam, facet JSON byte'ları) döndürür"""
+    with SessionLocal() as db:
+        facets = crud.tender_facet_counts(db, query, source_slug, date_from, date_to, category)
+    total = sum(f["count"] for f in facets["source"])
+    result = (total, json.dumps(facets, ensure_ascii=False).encode("utf-8"))
+    tender_query_cache.set(tender_facets_key(query, source_slug, date_from, date_to, category), result, version=version)
+    return result
+
+
+def query_cache_stats() -> Dict[str, dict]:
+    return {tender_query_cache.name: tender_query_cache.stats()}
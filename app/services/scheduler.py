@@ -1,19 +1,47 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+import asyncio
 from datetime import datetime, time
 import json
 import os
+import uuid
 from typing import List, Optional
 
-from .scrapers.base_models import ScrapedTender
-from .scraper_service import scraper_service
 from .email_service import email_service
+from .outbox import enqueue_envelopes, enqueue_mail, outbox_worker
+from .. import crud
+from ..config import settings
 from ..models.schedule import ScheduleConfig
+from ..db import engine, SessionLocal
+
+# Zamanlanmış mail işleri veritabanında saklanır; yeniden başlatmada kaybolmaz
+MAIL_JOBSTORE = "mail"
+
+# Son bildirimde gönderilen en büyük ihale id'si (app_state anahtarı)
+NOTIFY_WATERMARK_KEY = "notify_last_tender_id"
+
+
+def watermark_value(tender_id: int) -> str:
+    """<ihale id>:<çalışma> biçiminde watermark.
+
+    Yeni ihale yokken de her çalışma değeri değiştirir; böylece aynı değeri
+    okuyan iki çalışmadan yalnızca biri compare-and-set'i geçer.
+    """
+    return f"{tender_id}:{uuid.uuid4().hex[:8]}"
+
+
+def watermark_tender_id(value: str) -> int:
+    """watermark_value'nun ihale id'si; eski düz sayı değerleri de okunur"""
+    return int(value.split(":", 1)[0])
 
 class SchedulerService:
     def __init__(self):
-        self.scheduler = AsyncIOScheduler()
-        self.cached_tenders: List[ScrapedTender] = []
+        self.scheduler = AsyncIOScheduler(jobstores={
+            "default": MemoryJobStore(),
+            MAIL_JOBSTORE: SQLAlchemyJobStore(engine=engine, tablename="apscheduler_jobs"),
+        })
         self.config_file = "schedule_config.json"
 
     def start(self):
@@ -22,7 +50,9 @@ class SchedulerService:
             with open(self.config_file, 'r') as f:
                 config = ScheduleConfig.model_validate_json(f.read())
                 self.update_schedule(config)
-        
+
+        # Periyodik tarama API'de değil, tarama worker'larında (python -m app.worker)
+        # çalışır; bildirimler yalnızca worker'ların kaydettiği ihaleleri okur
         self.scheduler.start()
 
     def stop(self):
@@ -31,15 +61,17 @@ class SchedulerService:
 
     def update_schedule(self, config: ScheduleConfig):
         """Mail gönderim zamanlarını günceller"""
-        # Mevcut tüm görevleri temizle
-        self.scheduler.remove_all_jobs()
+        # Mevcut bildirim görevlerini temizle (tarama ve mail planı işleri kalır)
+        for job in self.scheduler.get_jobs(jobstore="default"):
+            if job.id.startswith("mail_job_"):
+                job.remove()
         
         if not config.is_active:
             return
 
         # Her saat için yeni bir görev oluştur
-        for time_str in config.times:
-            hour, minute = map(int, time_str.split(':'))
+        for scheduled in config.times:
+            hour, minute = scheduled.hour, scheduled.minute
             trigger = CronTrigger(
                 hour=hour,
                 minute=minute,
@@ -55,21 +87,43 @@ class SchedulerService:
         with open(self.config_file, 'w') as f:
             f.write(config.model_dump_json())
 
+    def _notify_new_tenders(self) -> bool:
+        """Watermark'tan bu yana kaydedilen ihalelerin bildirimini outbox'a yazar.
+
+        Watermark compare-and-set ile ilerletilir ve bildirim maili aynı
+        transaction'da outbox'a eklenir; gönderim başarısız olsa da aralık
+        kaybolmaz, outbox tekrar dener. Aynı anda çalışan başka bir süreç aynı
+        aralığı aldıysa False döner.
+        """
+        with SessionLocal() as db:
+            since = crud.get_app_state(db, NOTIFY_WATERMARK_KEY)
+            until = crud.max_tender_id(db)
+            if not crud.swap_app_state(db, NOTIFY_WATERMARK_KEY, since, watermark_value(until), commit=False):
+                return False
+            tenders, total = [], 0
+            if since is not None:
+                # İlk çalışmada mevcut ihaleler bildirilmez, bundan sonrası takip edilir
+                tenders, total = crud.new_tenders_since(
+                    db, watermark_tender_id(since), until,
+                    query=None, source_slug=None, date_from=None, date_to=None, category=None,
+                    limit=settings.NOTIFY_MAX_TENDERS,
+                )
+            msg = email_service.tender_notification(tenders, total)
+            enqueue_envelopes(db, msg, [list(settings.NOTIFICATION_RECIPIENTS)], commit=False)
+            db.commit()
+        outbox_worker.wake()
+        return True
+
+    def _notify_error(self, error_message: str):
+        with SessionLocal() as db:
+            enqueue_mail(db, email_service.error_notification(error_message))
+
     async def check_and_notify(self):
-        """Yeni ihaleleri kontrol eder ve mail gönderir"""
-        new_tenders = []
+        """Son bildirimden bu yana kaydedilen ihaleleri mail ile bildirir; tarama yapmaz"""
         try:
-            async for tender in scraper_service.scrape_all():
-                if tender not in self.cached_tenders:
-                    new_tenders.append(tender)
-            
-            if new_tenders:
-                await email_service.send_tender_notification(new_tenders)
-                self.cached_tenders = new_tenders
-            else:
-                await email_service.send_no_new_tenders_notification()
-                
+            await asyncio.to_thread(self._notify_new_tenders)
         except Exception as e:
-            await email_service.send_error_notification(str(e))
+            print(f"✗ Bildirim hazırlanamadı: {e}")
+            await asyncio.to_thread(self._notify_error, str(e))
 
-scheduler_service = SchedulerService()
\ No newline at end of file
+scheduler_service = SchedulerService()
@@ -0,0 +1,365 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
+
+from sqlalchemy import exists, func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session
+
+from .. import crud, models
+from ..config import settings
+from ..db import SessionLocal
+from .percolator import saved_search_index
+from .scrape_manager import get_scraper, scrape_source, select_specs
+
+
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("completed", "failed")
+
+# /scrape-jobs listesinde gösterilen en fazla iş
+MAX_LISTED_JOBS = 50
+
+# Worker'ların her yoklamada güncellediği app_state anahtarı (UTC, ISO)
+WORKER_SEEN_KEY = "scrape_worker_seen"
+
+NO_WORKER_WARNING = "Son dakikalarda çalışan tarama worker'ı görülmedi; işler `python -m app.worker` başlatılınca işlenir"
+
+
+def job_to_dict(job: models.ScrapeJob) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "sites": json.loads(job.sites) if job.sites else None,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "inserted": job.inserted,
+        "error": job.error,
+        "sources": {
+            task.slug: {"name": task.name, "status": task.status, "inserted": task.inserted, "error": task.error}
+            for task in job.tasks
+        },
+    }
+
+
+def _active_job(db: Session) -> Optional[models.ScrapeJob]:
+    return db.execute(
+        select(models.ScrapeJob)
+        .where(models.ScrapeJob.status.in_(ACTIVE_STATUSES))
+        .order_by(models.ScrapeJob.created_at.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+def enqueue_scrape_job(
+    db: Session,
+    sites: Optional[List[str]] = None,
+    newer_than: Optional[datetime] = None,
+) -> Tuple[Optional[models.ScrapeJob], bool]:
+    """Kaynak başına bir görevle yeni iş ekler; bekleyen/çalışan iş varsa onu döndürür (coalesced=True).
+
+    Kontrol ve ekleme tek INSERT ... WHERE NOT EXISTS ile yapılır; birden fazla
+    API/worker süreci aynı anda çağırsa da tek aktif iş oluşur. newer_than
+    verilirse o andan sonra oluşturulmuş bir iş varken de eklenmez (periyodik
+    tarama için) ve bu durumda (None, True) döner.
+    """
+    specs = select_specs(sites)
+    job = models.ScrapeJob
+    blocking = job.status.in_(ACTIVE_STATUSES)
+    if newer_than is not None:
+        blocking = or_(blocking, job.created_at > newer_than)
+
+    job_id = uuid.uuid4().hex
+    now = datetime.utcnow()
+    created = db.execute(
+        insert(job).from_select(
+            ["id", "status", "sites", "inserted", "created_at"],
+            select(
+                literal(job_id),
+                literal("queued"),
+                literal(json.dumps(sites) if sites else None),
+                literal(0),
+                literal(now),
+            ).where(~exists().where(blocking)),
+        )
+    ).rowcount
+    if not created:
+        db.rollback()
+        active = _active_job(db)
+        if active is None and newer_than is None:
+            # Engelleyen iş bu arada bitti
+            return enqueue_scrape_job(db, sites)
+        return active, True
+
+    db.add_all(models.ScrapeTask(job_id=job_id, slug=spec.slug, name=spec.name, status="pending") for spec in specs)
+    db.commit()
+    return db.get(job, job_id), False
+
+
+def get_scrape_job(db: Session, job_id: str) -> Optional[models.ScrapeJob]:
+    return db.get(models.ScrapeJob, job_id)
+
+
+def list_scrape_jobs(db: Session, limit: int = MAX_LISTED_JOBS) -> List[models.ScrapeJob]:
+    return db.execute(
+        select(models.ScrapeJob).order_by(models.ScrapeJob.created_at.desc()).limit(limit)
+    ).scalars().all()
+
+
+def _job_snapshot(job_id: str) -> Optional[dict]:
+    with SessionLocal() as db:
+        job = get_scrape_job(db, job_id)
+        return job_to_dict(job) if job else None
+
+
+async def stream_scrape_job(job_id: str) -> AsyncGenerator[dict, None]:
+    """İşi SCRAPE_JOB_POLL_SECONDS aralıkla okuyup kaynak durum değişikliklerini olaylara çevirir.
+
+    Olaylar süreç içinde tutulmaz; iş başka bir süreçte (worker) çalışır. Bağlanan
+    istemci önce mevcut durumu olay olarak alır, iş bitene kadar farkları izler.
+    """
+    def message(event: str, **data) -> dict:
+        return {"event": event, "data": {"job_id": job_id, **data}}
+
+    seen: Dict[str, str] = {}
+    while True:
+        snapshot = await asyncio.to_thread(_job_snapshot, job_id)
+        if snapshot is None:
+            return
+        if not seen:
+            yield message("started", sources=[{"slug": slug, "name": src["name"]} for slug, src in snapshot["sources"].items()])
+        for slug, src in snapshot["sources"].items():
+            previous, status = seen.get(slug, "pending"), src["status"]
+            seen[slug] = status
+            if status == previous or status == "pending":
+                continue
+            if previous == "pending":
+                yield message("source_started", slug=slug, name=src["name"])
+            if status == "completed":
+                yield message("source_finished", slug=slug, name=src["name"], inserted=src["inserted"])
+            elif status == "failed":
+                yield message("source_failed", slug=slug, name=src["name"], error=src["error"])
+        if snapshot["status"] in FINISHED_STATUSES:
+            yield message(snapshot["status"], inserted=snapshot["inserted"], error=snapshot["error"])
+            return
+        await asyncio.sleep(settings.SCRAPE_JOB_POLL_SECONDS)
+
+
+def worker_alive(db: Session) -> bool:
+    """Son SCRAPE_LEASE_SECONDS içinde yoklama yapan ya da görev heartbeat'i gönderen worker var mı"""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.SCRAPE_LEASE_SECONDS)
+    seen = crud.get_app_state(db, WORKER_SEEN_KEY)
+    if seen and datetime.fromisoformat(seen) >= cutoff:
+        return True
+    task = models.ScrapeTask
+    return db.execute(select(exists().where(task.status == "running", task.heartbeat_at >= cutoff))).scalar()
+
+
+def scrape_job_counts(db: Session) -> dict:
+    rows = db.execute(select(models.ScrapeTask.status, func.count()).group_by(models.ScrapeTask.status)).all()
+    return {status: count for status, count in rows}
+
+
+class ScrapeWorker:
+    """scrape_tasks tablosundan görev talep edip çalıştıran süreç (python -m app.worker).
+
+    Her görev tek kaynaktır; birden fazla worker aynı işin kaynaklarını
+    paylaşır. Görev koşullu UPDATE ile talep edilir, çalışırken ayrı bir
+    thread heartbeat_at'i yeniler (Selenium gibi bloklayan scraper'lar event
+    loop'u tutsa da lease düşmez). Heartbeat'i SCRAPE_LEASE_SECONDS'tan eski
+    görevler yeniden kuyruğa alınır; SCRAPE_TASK_MAX_ATTEMPTS denemeden sonra
+    başarısız sayılır. Periyodik tarama işini de worker'lar ekler.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.completed = 0
+        self.failed = 0
+        self.lost = 0
+
+    async def run(self):
+        print(f"✓ Tarama worker'ı başladı: {self.worker_id}")
+        while True:
+            try:
+                worked = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"✗ Tarama worker'ı hatası: {e}")
+                worked = False
+            if not worked:
+                await asyncio.sleep(settings.SCRAPE_WORKER_POLL_SECONDS)
+
+    async def run_once(self) -> bool:
+        """Bir görev çalıştırır; bekleyen görev yoksa False"""
+        task = await asyncio.to_thread(self._next_task)
+        if task is None:
+            return False
+        await self._execute(task)
+        return True
+
+    def _next_task(self) -> Optional[models.ScrapeTask]:
+        with SessionLocal() as db:
+            crud.set_app_state(db, WORKER_SEEN_KEY, datetime.utcnow().isoformat())
+            self._release_expired(db)
+            self._enqueue_periodic(db)
+            return self._claim(db)
+
+    def _enqueue_periodic(self, db: Session):
+        if settings.SCRAPE_INTERVAL_MINUTES <= 0:
+            return
+        cutoff = datetime.utcnow() - timedelta(minutes=settings.SCRAPE_INTERVAL_MINUTES)
+        job, coalesced = enqueue_scrape_job(db, newer_than=cutoff)
+        if not coalesced:
+            print(f"✓ Periyodik tarama işi eklendi: {job.id}")
+
+    def _release_expired(self, db: Session):
+        """Heartbeat'i kesilmiş (worker'ı düşmüş) görevleri geri alır"""
+        task = models.ScrapeTask
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.SCRAPE_LEASE_SECONDS)
+        expired = db.execute(
+            select(task).where(task.status == "running", task.heartbeat_at < cutoff)
+        ).scalars().all()
+        for item in expired:
+            owner = item.worker_id
+            exhausted = item.attempts >= settings.SCRAPE_TASK_MAX_ATTEMPTS
+            values = dict(status="pending", worker_id=None)
+            if exhausted:
+                values = dict(status="failed", error=f"Worker yanıt vermedi ({owner})", finished_at=datetime.utcnow())
+            released = db.execute(
+                update(task)
+                .where(task.id == item.id, task.status == "running", task.heartbeat_at == item.heartbeat_at)
+                .values(**values)
+            ).rowcount
+            if released:
+                print(f"⚠ {item.slug} görevinin lease süresi doldu ({owner}), {'başarısız' if exhausted else 'yeniden kuyrukta'}")
+                if exhausted:
+                    self._finish_job(db, item.job_id)
+        db.commit()
+
+    def _claim(self, db: Session) -> Optional[models.ScrapeTask]:
+        task = models.ScrapeTask
+        now = datetime.utcnow()
+        # Aynı kaynağı başka bir worker şu an tarıyorsa o kaynağın görevleri beklesin
+        busy = select(task.slug).where(task.status == "running")
+        candidates = db.execute(
+            select(task.id, task.job_id)
+            .where(task.status == "pending", task.slug.not_in(busy))
+            .order_by(task.id)
+            .limit(10)
+        ).all()
+        for task_id, job_id in candidates:
+            # Koşullu güncelleme: başka bir worker aynı görevi aldıysa atla
+            taken = db.execute(
+                update(task)
+                .where(task.id == task_id, task.status == "pending")
+                .values(status="running", worker_id=self.worker_id, heartbeat_at=now, started_at=now, attempts=task.attempts + 1)
+            ).rowcount
+            if not taken:
+                continue
+            db.execute(
+                update(models.ScrapeJob)
+                .where(models.ScrapeJob.id == job_id, models.ScrapeJob.status == "queued")
+                .values(status="running", started_at=now)
+            )
+            db.commit()
+            claimed = db.get(task, task_id)
+            db.expunge(claimed)
+            return claimed
+        db.commit()
+        return None
+
+    def _heartbeat(self, task_id: int, stop: threading.Event):
+        task = models.ScrapeTask
+        while not stop.wait(settings.SCRAPE_HEARTBEAT_SECONDS):
+            with SessionLocal() as db:
+                alive = db.execute(
+                    update(task)
+                    .where(task.id == task_id, task.worker_id == self.worker_id, task.status == "running")
+                    .values(heartbeat_at=datetime.utcnow())
+                ).rowcount
+                db.commit()
+            if not alive:
+                return
+
+    async def _execute(self, task: models.ScrapeTask):
+        stop = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(task.id, stop), daemon=True).start()
+        inserted, error = 0, None
+        try:
+            # Kayıtlı aramalar API sürecinde değişmiş olabilir
+            saved_search_index.invalidate()
+            with SessionLocal() as db:
+                inserted = await scrape_source(db, get_scraper(task.slug))
+        except Exception as e:
+            print(f"✗ Error scraping {task.name}: {e}")
+            error = str(e)
+        finally:
+            stop.set()
+        await asyncio.to_thread(self._finish_task, task, inserted, error)
+
+    def _finish_task(self, item: models.ScrapeTask, inserted: int, error: Optional[str]):
+        task = models.ScrapeTask
+        with SessionLocal() as db:
+            finished = db.execute(
+                update(task)
+                .where(task.id == item.id, task.worker_id == self.worker_id, task.status == "running")
+                .values(
+                    status="failed" if error else "completed",
+                    inserted=inserted,
+                    error=error,
+                    finished_at=datetime.utcnow(),
+                )
+            ).rowcount
+            if not finished:
+                # Lease bu sırada başka bir worker'a geçti; eklenen ihaleler hash ile tekilleşir
+                self.lost += 1
+                print(f"⚠ {item.slug} görevi artık bu worker'da değil, sonuç yazılmadı")
+                db.commit()
+                return
+            if error:
+                self.failed += 1
+            else:
+                self.completed += 1
+            self._finish_job(db, item.job_id)
+            db.commit()
+
+    def _finish_job(self, db: Session, job_id: str):
+        """İşin tüm görevleri bittiyse işi kapatır (commit etmez)"""
+        task = models.ScrapeTask
+        statuses = db.execute(
+            select(task.status, func.count(), func.coalesce(func.sum(task.inserted), 0))
+            .where(task.job_id == job_id)
+            .group_by(task.status)
+        ).all()
+        counts = {status: count for status, count, _ in statuses}
+        if any(status not in FINISHED_STATUSES for status in counts):
+            return
+        failed = counts.get("failed", 0)
+        all_failed = failed and failed == sum(counts.values())
+        inserted = sum(total for _, _, total in statuses)
+        closed = db.execute(
+            update(models.ScrapeJob)
+            .where(models.ScrapeJob.id == job_id, models.ScrapeJob.status.in_(ACTIVE_STATUSES))
+            .values(
+                status="failed" if all_failed else "completed",
+                inserted=inserted,
+                error="Tüm kaynaklar başarısız oldu" if all_failed else None,
+                finished_at=datetime.utcnow(),
+            )
+        ).rowcount
+        if closed:
+            print(f"Total: {inserted} new tenders added (job {job_id})")
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "completed": self.completed,
+            "failed": self.failed,
+            "lost": self.lost,
+        }
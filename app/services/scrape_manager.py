@@ -1,83 +1,102 @@
 from __future__ import annotations
-from typing import List
+import importlib
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from datetime import datetime
-from ..db import SessionLocal
 from .. import crud, models
-from .scraper_base import BaseScraper, ScrapedTender
-from .scrapers.dmo_scraper import DMOScraper
-from .scrapers.turksat_scraper import TurksatScraper
-from .scrapers.teias_scraper import TEIASScraper
-from .scrapers.ptt_scraper import PTTScraper
-from .scrapers.tpao_scraper import TPAOScraper
-from .scrapers.tedas_scraper import TEDASScraper
-from .scrapers.jandarma_scraper import JandarmaScraper
-from .scrapers.botas_scraper import BOTASScraper
-from .scrapers.euas_scraper import EUASScraper
-from .scrapers.egm_scraper import EGMScraper
-
-
-class StubScraper(BaseScraper):
-	def parse(self, soup):
-		return []
-
-
-SCRAPERS: List[BaseScraper] = [
-	DMOScraper(),
-	TurksatScraper(),
-	TEIASScraper(),
-	PTTScraper(),
-	TPAOScraper(),
-	TEDASScraper(),
-	JandarmaScraper(),
-	BOTASScraper(),
-	EUASScraper(),
-	EGMScraper(),
-]
-
-
-async def run_all_scrapers(sites: List[str] = None) -> int:
-    inserted = 0
-    with SessionLocal() as db:
-        # Hangi scraperları çalıştıracağımızı belirle
-        scrapers_to_run = SCRAPERS
-        if sites:
-            scrapers_to_run = [s for s in SCRAPERS if s.slug in sites]
-            
-        for s in scrapers_to_run:
-            try:
-                print(f"Scraping {s.name}...")
-                source = crud.ensure_source(db, name=s.name, url=s.base_url, slug=s.slug)
-                items = await s.scrape()
-                
-                scraper_count = 0
-                for it in items:
-                    try:
-                        created = crud.create_tender_if_new(
-                            db=db,
-                            source=source,
-                            title=it.title,
-                            url=it.url,
-                            description=it.description,
-                            published_at=it.published_at,
-                        )
-                        if created:
-                            inserted += 1
-                            scraper_count += 1
-                    except Exception as e:
-                        print(f"Error creating tender from {s.name}: {e}")
-                        continue
-                
-                print(f"✓ {s.name}: {scraper_count} new tenders added")
-                
-            except Exception as e:
-                print(f"✗ Error scraping {s.name}: {e}")
-                continue
-    
-    print(f"Total: {inserted} new tenders added")
-    return inserted
 
+if TYPE_CHECKING:
+	from .scraper_base import BaseScraper
+
+
+class ScraperSpec(NamedTuple):
+	slug: str
+	name: str
+	base_url: str
+	target: str  # "paket.modül:Sınıf"
+
+
+# Tek scraper kaydı; scrape-now ve periyodik tarama aynı kaydı kullanır. API
+# yalnızca bu tanımları okur, scraper modülleri worker'da ilk kullanımda
+# import edilir.
+SCRAPERS: Dict[str, ScraperSpec] = {
+	spec.slug: spec
+	for spec in (
+		ScraperSpec("dmo", "DMO", "https://dmo.gov.tr/Ihale/Liste?type=1",
+			"app.services.scrapers.dmo_scraper:DMOScraper"),
+		ScraperSpec("turksat", "Türksat", "https://www.turksat.com.tr/tr/satin-alma-ilanlari",
+			"app.services.scrapers.turksat_scraper:TurksatScraper"),
+		ScraperSpec("teias", "TEİAŞ", "https://www.teias.gov.tr/ihaleler",
+			"app.services.scrapers.teias_scraper:TEIASScraper"),
+		ScraperSpec("ptt", "PTT", "https://www.ptt.gov.tr/duyurular?announcementType=3&pageSize=200&page=1",
+			"app.services.scrapers.ptt_scraper:PTTScraper"),
+		ScraperSpec("tpao", "TPAO", "https://www.tpao.gov.tr/ihale-duyurulari/",
+			"app.services.scrapers.tpao_scraper:TPAOScraper"),
+		ScraperSpec("tedas", "TEDAŞ", "https://www.tedas.gov.tr/A/1/ihaleler/RoutePage/63c650f7d27de36b22f9ce2e",
+			"app.services.scrapers.tedas_scraper:TEDASScraper"),
+		ScraperSpec("jandarma", "Jandarma", "https://vatandas.jandarma.gov.tr/ihalesorgu/",
+			"app.services.scrapers.jandarma_scraper:JandarmaScraper"),
+		ScraperSpec("botas", "BOTAŞ", "https://www.botas.gov.tr/Kategori/ihale-ilanlari/3",
+			"app.services.scrapers.botas_scraper:BOTASScraper"),
+		ScraperSpec("euas", "EÜAŞ", "https://www.euas.gov.tr/ihaleler",
+			"app.services.scrapers.euas_scraper:EUASScraper"),
+		ScraperSpec("egm", "EGM", "https://www.egm.gov.tr/destekhizmetleri/ihale-takvimi",
+			"app.services.scrapers.egm_scraper:EGMScraper"),
+	)
+}
+
+_instances: Dict[str, "BaseScraper"] = {}
+
+
+def get_scraper(slug: str) -> "BaseScraper":
+	"""Scraper örneğini döndürür; modülü ilk çağrıda import eder"""
+	scraper = _instances.get(slug)
+	if scraper is None:
+		module_name, _, class_name = SCRAPERS[slug].target.partition(":")
+		scraper = getattr(importlib.import_module(module_name), class_name)()
+		_instances[slug] = scraper
+	return scraper
 
-async def trigger_scrape_once() -> int:
-	return await run_all_scrapers()
+
+def select_specs(sites: Optional[List[str]] = None) -> List[ScraperSpec]:
+	"""sites boşsa tüm kaynaklar; bilinmeyen slug için ValueError"""
+	if sites:
+		unknown = set(sites) - SCRAPERS.keys()
+		if unknown:
+			raise ValueError(f"Bilinmeyen kaynak: {', '.join(sorted(unknown))}")
+	return [spec for slug, spec in SCRAPERS.items() if not sites or slug in sites]
+
+
+def register_sources(db: Session):
+	"""Kayıttaki tüm kaynakların sources tablosunda olmasını sağlar (scraper import etmez)"""
+	for spec in SCRAPERS.values():
+		crud.ensure_source(db, name=spec.name, url=spec.base_url, slug=spec.slug)
+
+
+async def scrape_source(db: Session, scraper: "BaseScraper") -> int:
+    """Tek kaynağı tarar ve yeni ihaleleri kaydeder; eklenen ihale sayısını döndürür"""
+    print(f"Scraping {scraper.name}...")
+    source = crud.ensure_source(db, name=scraper.name, url=scraper.base_url, slug=scraper.slug)
+    items = await scraper.scrape()
+
+    inserted = 0
+    for it in items:
+        try:
+            created = crud.create_tender_if_new(
+                db=db,
+                source=source,
+                title=it.title,
+                url=it.url,
+                description=it.description,
+                published_at=it.published_at,
+            )
+            if created:
+                inserted += 1
+        except Exception as e:
+            print(f"Error creating tender from {scraper.name}: {e}")
+            db.rollback()
+            continue
+
+    print(f"✓ {scraper.name}: {inserted} new tenders added")
+    return inserted
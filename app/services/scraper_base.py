@@ -3,12 +3,6 @@ import httpx
 from bs4 import BeautifulSoup
 from datetime import datetime
 from typing import Iterable, Optional, AsyncGenerator
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 
 
@@ -44,6 +38,15 @@ class BaseScraper:
 
 	def fetch_html_with_selenium(self, url: str, wait_for_element: str = None, timeout: int = 10) -> str:
 		"""Selenium kullanarak JavaScript render edilen HTML'i al"""
+		# Ağır bağımlılıklar yalnızca tarayıcı gereken kaynaklarda yüklenir
+		from selenium import webdriver
+		from selenium.webdriver.chrome.options import Options
+		from selenium.webdriver.chrome.service import Service
+		from selenium.webdriver.common.by import By
+		from selenium.webdriver.support.ui import WebDriverWait
+		from selenium.webdriver.support import expected_conditions as EC
+		from webdriver_manager.chrome import ChromeDriverManager
+
 		options = Options()
 		options.add_argument('--headless')  # Arka planda çalıştır
 		options.add_argument('--no-sandbox')
@@ -56,7 +59,7 @@ class BaseScraper:
 		try:
 			# ChromeDriver'ı otomatik indir ve kullan
 			driver = webdriver.Chrome(
-				service=webdriver.chrome.service.Service(ChromeDriverManager().install()),
+				service=Service(ChromeDriverManager().install()),
 				options=options
 			)
 			
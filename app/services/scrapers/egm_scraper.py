@@ -6,8 +6,6 @@ import asyncio
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from io import BytesIO
-from PIL import Image
-import pytesseract
 from ..scraper_base import BaseScraper, ScrapedTender
 
 class EGMScraper(BaseScraper):
@@ -86,6 +84,10 @@ class EGMScraper(BaseScraper):
     
     def parse_image(self, image_bytes: bytes) -> list[dict]:
         """Resimden ihale bilgilerini çıkar"""
+        # OCR bağımlılıkları yalnızca EGM taranırken yüklenir
+        from PIL import Image
+        import pytesseract
+
         try:
             # Resmi aç
             image = Image.open(BytesIO(image_bytes))
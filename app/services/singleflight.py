@@ -0,0 +1,60 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+
+class SingleFlight:
+    """Aynı anahtarla eşzamanlı gelen çağrıları tek bir hesaplamada birleştirir.
+
+    İlk çağrı hesaplamayı ayrı bir Task olarak başlatır, aynı anahtarla gelen
+    diğer çağrılar bu Task'ın sonucunu bekler. Çağıranlardan biri iptal edilse
+    de (ör. istemci bağlantıyı kapattı) hesaplama diğerleri için devam eder.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+        _groups.append(self)
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._finish(key, t))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Tüm bekleyenler iptal edildiyse "exception never retrieved" uyarısını önle
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._inflight),
+        }
+
+
+_groups: List[SingleFlight] = []
+
+
+def singleflight_stats() -> Dict[str, dict]:
+    """Tüm single-flight gruplarının metriklerini döndürür"""
+    return {group.name: group.stats() for group in _groups}
+
+
+search_flight = SingleFlight("search")
+sources_flight = SingleFlight("sources")
+categories_flight = SingleFlight("categories")
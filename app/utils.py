@@ -1,3 +1,5 @@
+import hashlib
+import json
 from passlib.context import CryptContext
 
 # Password hashing
@@ -10,3 +12,28 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
+
+
+def format_sse(data: dict, event: str | None = None) -> str:
+    """Server-Sent Events formatında tek bir mesaj üretir."""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def weak_etag(version, *parts) -> str:
+    """Veri sürümü ve istek parametrelerinden zayıf bir ETag üretir."""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match başlığını zayıf karşılaştırma ile ETag'e karşı denetler."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
@@ -0,0 +1,35 @@
+"""Tarama worker'ı: scrape_tasks kuyruğundan kaynak görevlerini talep edip çalıştırır.
+
+API süreci yalnızca iş ekler ve sonuçları okur; Selenium, OCR ve parse işi
+bu süreçte yapılır. Birden fazla worker aynı veritabanıyla çalışabilir:
+
+    python -m app.worker
+    python -m app.worker --worker-id tarama-1
+"""
+import argparse
+import asyncio
+
+from .db import SessionLocal
+from .migrations import init_db
+from .services.scrape_jobs import ScrapeWorker
+from .services.scrape_manager import register_sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İhale tarama worker'ı")
+    parser.add_argument("--worker-id", default=None, help="lease kayıtlarında görünen ad (varsayılan host:pid)")
+    args = parser.parse_args()
+
+    init_db()
+    with SessionLocal() as db:
+        register_sources(db)
+
+    worker = ScrapeWorker(worker_id=args.worker_id)
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        print(f"Tarama worker'ı durdu: {worker.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -50,6 +50,7 @@ export default function Home() {
   const [emailAddress, setEmailAddress] = useState('')
   const [activeTab, setActiveTab] = useState('ALL')
   const [lastUpdate, setLastUpdate] = useState<string>('')
+  const [scrapeProgress, setScrapeProgress] = useState('')
   const [filters, setFilters] = useState<Filters>({
     query: '',
     source_slug: '',
@@ -61,6 +62,20 @@ export default function Home() {
   useEffect(() => {
     loadSources()
     loadAllTenders()
+
+    // Yeni ihaleler sunucudan anlık gelir; sayfayı yenilemeye gerek kalmaz
+    const stream = new EventSource('http://localhost:8000/api/tenders/stream')
+    stream.addEventListener('tender', (e) => {
+      const { tender } = JSON.parse((e as MessageEvent).data)
+      setAllTenders(prev => [tender, ...prev])
+      setTenders(prev => [tender, ...prev])
+      setLastUpdate(tender.created_at)
+    })
+    stream.addEventListener('overflow', () => {
+      // Tampon taştı, bazı ihaleler kaçırıldı; listeyi baştan yükle
+      loadAllTenders()
+    })
+    return () => stream.close()
   }, [])
 
   const loadSources = async () => {
@@ -75,38 +90,32 @@ export default function Home() {
   const loadAllTenders = async () => {
     setLoading(true)
     try {
-      const response = await axios.post('http://localhost:8000/api/tenders/search', {
-        query: '',
-        source_slug: '',
-        limit: 500
+      // GET uç noktası ETag döndürür; değişiklik yoksa tarayıcı 304 ile önbellekten okur
+      const response = await axios.get('http://localhost:8000/api/tenders/search', {
+        // Kartlar açıklamanın ilk 200 karakterini gösterir; fazlası veritabanında kırpılır
+        params: { limit: 500, snippet_len: 201, facets: true }
       })
-      const tendersData = response.data
+      const tendersData = response.data.tenders
       setAllTenders(tendersData)
       setTenders(tendersData)
       
-      // Kaynak istatistiklerini hesapla
-      const stats: { [key: string]: SourceStats } = {}
+      // Kaynak sayıları yanıttaki facet'lerden gelir (500'lük örnekten değil, kesin sayılar)
+      const lastUpdates: { [key: string]: string } = {}
       tendersData.forEach((tender: Tender) => {
-        const sourceName = tender.source?.name || 'Bilinmiyor'
         const sourceSlug = tender.source?.slug || 'unknown'
-        
-        if (!stats[sourceSlug]) {
-          stats[sourceSlug] = {
-            name: sourceName,
-            slug: sourceSlug,
-            count: 0,
-            lastUpdate: tender.created_at
-          }
-        }
-        stats[sourceSlug].count++
-        
-        // En son güncelleme tarihini bul
-        if (new Date(tender.created_at) > new Date(stats[sourceSlug].lastUpdate || '')) {
-          stats[sourceSlug].lastUpdate = tender.created_at
+        if (!lastUpdates[sourceSlug] || new Date(tender.created_at) > new Date(lastUpdates[sourceSlug])) {
+          lastUpdates[sourceSlug] = tender.created_at
         }
       })
       
-      const sortedStats = Object.values(stats).sort((a, b) => b.count - a.count)
+      const sortedStats: SourceStats[] = (response.data.facets?.source ?? []).map(
+        (facet: { slug: string | null, name: string | null, count: number }) => ({
+          name: facet.name || 'Bilinmiyor',
+          slug: facet.slug || 'unknown',
+          count: facet.count,
+          lastUpdate: lastUpdates[facet.slug || 'unknown']
+        })
+      )
       setSourceStats(sortedStats)
       
       // Genel son güncelleme
@@ -131,6 +140,7 @@ export default function Home() {
     try {
       const response = await axios.post('http://localhost:8000/api/tenders/search', {
         ...filters,
+        snippet_len: 201,
         date_from: filters.date_from ? new Date(filters.date_from).toISOString() : null,
         date_to: filters.date_to ? new Date(filters.date_to).toISOString() : null,
       })
@@ -157,8 +167,10 @@ export default function Home() {
 
   const exportCSV = async () => {
     try {
+      // Dışa aktarım akış olarak yapılır; ekrandaki limit yerine tüm eşleşen ihaleler indirilir
       const response = await axios.post('http://localhost:8000/api/tenders/export.csv', {
         ...filters,
+        limit: null,
         date_from: filters.date_from ? new Date(filters.date_from).toISOString() : null,
         date_to: filters.date_to ? new Date(filters.date_to).toISOString() : null,
       }, {
@@ -204,15 +216,40 @@ export default function Home() {
 
   const triggerScrape = async () => {
     try {
-      setLoading(true)
       const response = await axios.post('http://localhost:8000/api/tenders/scrape-now')
-      alert(`Scraping tamamlandı. ${response.data.inserted} yeni ihale eklendi.`)
-      loadAllTenders()
+      const jobId = response.data.job_id
+      setScrapeProgress('Tarama başlatıldı...')
+
+      // Kaynak bazında ilerlemeyi SSE ile takip et
+      const events = new EventSource(`http://localhost:8000/api/tenders/scrape-jobs/${jobId}/events`)
+      events.addEventListener('source_started', (e) => {
+        const data = JSON.parse((e as MessageEvent).data)
+        setScrapeProgress(`${data.name} taranıyor...`)
+      })
+      events.addEventListener('source_finished', (e) => {
+        const data = JSON.parse((e as MessageEvent).data)
+        setScrapeProgress(`${data.name}: ${data.inserted} yeni ihale`)
+      })
+      events.addEventListener('completed', (e) => {
+        const data = JSON.parse((e as MessageEvent).data)
+        events.close()
+        setScrapeProgress('')
+        alert(`Scraping tamamlandı. ${data.inserted} yeni ihale eklendi.`)
+        loadAllTenders()
+      })
+      events.addEventListener('failed', (e) => {
+        const data = JSON.parse((e as MessageEvent).data)
+        events.close()
+        setScrapeProgress('')
+        setError(`Scraping hatası: ${data.error}`)
+      })
+      events.onerror = () => {
+        events.close()
+        setScrapeProgress('')
+      }
     } catch (err) {
       setError('Scraping hatası')
       console.error('Error triggering scrape:', err)
-    } finally {
-      setLoading(false)
     }
   }
 
@@ -392,7 +429,7 @@ export default function Home() {
             onClick={triggerScrape}
             className="bg-gradient-to-r from-orange-600 to-orange-700 text-white px-3 py-2 text-sm rounded-md hover:from-orange-700 hover:to-orange-800 focus:outline-none focus:ring-1 focus:ring-orange-500 shadow transform hover:scale-105 transition-all duration-200 font-medium flex items-center justify-center"
           >
-            🔄 Şimdi Tara
+            🔄 {scrapeProgress || 'Şimdi Tara'}
           </button>
         </div>
         
@@ -3,5 +3,10 @@
 # Activate virtual environment
 source .venv/bin/activate
 
+# Start the scrape worker in the background; scrapes do not run inside the API
+python -m app.worker &
+WORKER_PID=$!
+trap 'kill $WORKER_PID 2>/dev/null' EXIT
+
 # Start the FastAPI server
 uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+# Uygulama modülleri import edilmeden önce: ayarlar ortamdan okunur ve
+# app.db motoru bu adrese bağlanır; data.db'ye hiç dokunulmaz.
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='ihale-test-')}/app.db"
+os.environ.setdefault("DEFAULT_SENDER", "test@example.com")
+os.environ.setdefault("NOTIFICATION_RECIPIENTS", '["test@example.com"]')
+os.environ.setdefault("ERROR_NOTIFICATION_RECIPIENTS", '["test@example.com"]')
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import db as app_db
+from app.migrations import init_db
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Her test için migration'ları uygulanmış boş bir SQLite dosyası.
+
+    Servisler oturumlarını SessionLocal'dan açtığı için fabrika test
+    boyunca bu motora bağlanır.
+    """
+    test_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    init_db(test_engine)
+    app_db.SessionLocal.configure(bind=test_engine)
+    yield test_engine
+    app_db.SessionLocal.configure(bind=app_db.engine)
+    test_engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with app_db.SessionLocal() as session:
+        yield session
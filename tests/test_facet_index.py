@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from app.services.facet_index import BUDGET_CHECK_EVERY, FacetIndex
+
+ROWS = [
+    (1, 1, "insaat", datetime(2024, 1, 5)),
+    (2, 2, None, datetime(2024, 2, 1)),
+    (5, 1, "bilisim", None),
+]
+
+
+def test_add_many_matches_build():
+    built, added = FacetIndex(max_bytes=1 << 20), FacetIndex(max_bytes=1 << 20)
+    built.build(ROWS)
+    added.build([])
+    added.add_many(ROWS[:1])
+    added.add_many(ROWS[1:])
+    assert added._bits == built._bits and added._all == built._all
+    assert added.rows == built.rows == 3
+
+
+def test_readding_indexed_tender_does_not_inflate_rows():
+    index = FacetIndex(max_bytes=1 << 20)
+    index.build(ROWS)
+    # Açılış yüklemesi ile değişiklik izleyicisi aynı satırları tekrar verebilir
+    index.add_many(ROWS + ROWS[:1])
+    index.add(*ROWS[0])
+    assert index.rows == 3
+    assert index.query({"source": ["1"]})["total"] == 2
+
+
+def test_budget_checked_on_insert_count():
+    index = FacetIndex(max_bytes=1 << 20)
+    index.build([])
+    index.max_bytes = 1
+    # Hiçbiri 1024'ün katı değil; denetim id'ye değil eklenen sayıya bağlı
+    for tender_id in range(1, BUDGET_CHECK_EVERY + 1):
+        index.add(tender_id * 1024 + 1, 1, None, None)
+    assert not index.ready
+    assert "bütçe" in index.disabled_reason
@@ -0,0 +1,22 @@
+import pytest
+
+from app.scripts.check_import_budget import MAX_RSS_MB, MAX_SECONDS, measure
+
+
+@pytest.fixture(scope="module")
+def budget():
+    """import app.main temiz bir alt süreçte bir kez ölçülür"""
+    return measure()
+
+
+def test_api_import_skips_scraper_dependencies(budget):
+    # ScraperSpec kaydı scraper modüllerini ancak get_scraper() ile yükler
+    assert budget["loaded"] == []
+
+
+def test_api_import_time_within_budget(budget):
+    assert budget["seconds"] <= MAX_SECONDS
+
+
+def test_api_import_rss_within_budget(budget):
+    assert budget["rss_kb"] / 1024 <= MAX_RSS_MB
@@ -0,0 +1,39 @@
+import pytest
+
+from app import crud, models
+from app.services.scheduler import NOTIFY_WATERMARK_KEY, scheduler_service, watermark_tender_id
+
+
+@pytest.mark.parametrize("watermark", [None, "0"], ids=["first-run", "advance"])
+def test_only_one_run_advances_watermark(db, monkeypatch, watermark):
+    if watermark is not None:
+        crud.set_app_state(db, NOTIFY_WATERMARK_KEY, watermark)
+
+    # İlk çalışma watermark'ı okuduktan sonra ikincisi aynı değeri okuyup tamamlanır
+    max_tender_id = crud.max_tender_id
+    results = []
+
+    def racing_max_tender_id(session):
+        if not results:
+            results.append(None)
+            results.append(scheduler_service._notify_new_tenders())
+        return max_tender_id(session)
+
+    monkeypatch.setattr(crud, "max_tender_id", racing_max_tender_id)
+    results.append(scheduler_service._notify_new_tenders())
+
+    assert results[1:] == [True, False]
+    assert db.query(models.MailOutbox).count() == 1
+    db.expire_all()
+    value = crud.get_app_state(db, NOTIFY_WATERMARK_KEY)
+    assert value != watermark and watermark_tender_id(value) == 0
+
+
+def test_sequential_runs_each_notify(db):
+    assert scheduler_service._notify_new_tenders()
+    assert scheduler_service._notify_new_tenders()
+    assert db.query(models.MailOutbox).count() == 2
+
+
+def test_watermark_reads_plain_tender_id():
+    assert watermark_tender_id("42") == 42
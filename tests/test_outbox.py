@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+import pytest
+from fastapi import HTTPException
+
+from app import models
+from app.config import settings
+from app.db import SessionLocal
+from app.routers.admin import retry_outbox
+from app.services import outbox
+from app.services.outbox import OutboxWorker, enqueue_mail
+
+
+def _message(subject="Test"):
+    msg = EmailMessage()
+    msg["From"] = "sender@example.com"
+    msg["To"] = "to@example.com"
+    msg["Subject"] = subject
+    msg.set_content("gövde")
+    return msg
+
+
+@pytest.fixture
+def worker():
+    return OutboxWorker()
+
+
+def test_concurrent_claim_takes_row_once(db, worker):
+    item = enqueue_mail(db, _message())
+
+    # B adayları okuduktan sonra, koşullu UPDATE'inden hemen önce A aynı satırı talep eder
+    with SessionLocal() as db_a, SessionLocal() as db_b:
+        raced = []
+        execute = db_b.execute
+
+        def racing_execute(statement, *args, **kwargs):
+            if statement.is_dml and not raced:
+                raced.append([row.id for row in worker._claim(db_a, 10)])
+            return execute(statement, *args, **kwargs)
+
+        db_b.execute = racing_execute
+        claimed_b = worker._claim(db_b, 10)
+
+    assert raced == [[item.id]]
+    assert claimed_b == []
+    db.expire_all()
+    assert db.get(models.MailOutbox, item.id).status == "sending"
+
+
+def test_expired_lease_is_released(db, worker):
+    expired = enqueue_mail(db, _message("expired"))
+    fresh = enqueue_mail(db, _message("fresh"))
+    expired.status = fresh.status = "sending"
+    expired.next_attempt_at = datetime.utcnow() - timedelta(seconds=settings.OUTBOX_LEASE_SECONDS + 1)
+    fresh.next_attempt_at = datetime.utcnow()
+    db.commit()
+
+    worker._release_expired_leases()
+
+    db.expire_all()
+    assert db.get(models.MailOutbox, expired.id).status == "pending"
+    assert db.get(models.MailOutbox, fresh.id).status == "sending"
+
+
+def test_failures_back_off_then_go_dead(db, worker, monkeypatch):
+    monkeypatch.setattr(
+        outbox.mail_transport, "send_batch_sync",
+        lambda envelopes: [ConnectionError("bağlantı yok")] * len(envelopes),
+    )
+    item = enqueue_mail(db, _message())
+
+    before = datetime.utcnow()
+    assert worker._drain_once(10) == 1
+    db.expire_all()
+    row = db.get(models.MailOutbox, item.id)
+    assert (row.status, row.attempts) == ("pending", 1)
+    # Üstel bekleme: ilk hatada OUTBOX_RETRY_BASE_SECONDS ± %20
+    assert row.next_attempt_at >= before + timedelta(seconds=settings.OUTBOX_RETRY_BASE_SECONDS * 0.8)
+
+    row.attempts = settings.OUTBOX_MAX_ATTEMPTS - 1
+    row.next_attempt_at = datetime.utcnow()
+    db.commit()
+    assert worker._drain_once(10) == 1
+    db.expire_all()
+    row = db.get(models.MailOutbox, item.id)
+    assert (row.status, row.attempts) == ("dead", settings.OUTBOX_MAX_ATTEMPTS)
+    assert row.last_error == "bağlantı yok"
+    assert worker.dead == 1
+
+
+def test_admin_retry_requeues_dead_mail(db):
+    item = enqueue_mail(db, _message())
+    item.status = "dead"
+    item.attempts = settings.OUTBOX_MAX_ATTEMPTS
+    db.commit()
+
+    assert retry_outbox(item.id, db) == {"id": item.id, "status": "pending"}
+    db.expire_all()
+    row = db.get(models.MailOutbox, item.id)
+    assert (row.status, row.attempts) == ("pending", 0)
+
+
+def test_admin_retry_rejects_live_mail(db):
+    item = enqueue_mail(db, _message())
+    with pytest.raises(HTTPException) as excinfo:
+        retry_outbox(item.id, db)
+    assert excinfo.value.status_code == 404
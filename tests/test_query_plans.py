@@ -0,0 +1,17 @@
+import pytest
+
+from app.scripts.check_query_plans import CASES, build_engine, query_plan, uses_index
+
+
+@pytest.fixture(scope="module")
+def plan_engine():
+    """init_db() ile kurulmuş, ANALYZE edilmiş bellek içi SQLite"""
+    engine = build_engine()
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name, call, expected_index", CASES, ids=[case[0] for case in CASES])
+def test_query_uses_index(plan_engine, name, call, expected_index):
+    plan = query_plan(plan_engine, call)
+    assert uses_index(plan, expected_index), f"{name}: {' | '.join(plan)}"
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app import models
+from app.config import settings
+from app.db import SessionLocal
+from app.services.scrape_jobs import ScrapeWorker, enqueue_scrape_job
+
+SITES = ["dmo", "turksat"]
+
+
+def _tasks(db, job_id):
+    db.expire_all()
+    return {task.slug: task for task in db.get(models.ScrapeJob, job_id).tasks}
+
+
+def _expire_lease(db, task_id):
+    db.execute(
+        update(models.ScrapeTask)
+        .where(models.ScrapeTask.id == task_id)
+        .values(heartbeat_at=datetime.utcnow() - timedelta(seconds=settings.SCRAPE_LEASE_SECONDS + 1))
+    )
+    db.commit()
+
+
+def test_double_enqueue_coalesces(db):
+    first, coalesced = enqueue_scrape_job(db, SITES)
+    assert not coalesced
+    assert sorted(task.slug for task in first.tasks) == SITES
+
+    with SessionLocal() as other:
+        second, coalesced = enqueue_scrape_job(other, ["ptt"])
+        assert coalesced and second.id == first.id
+    assert db.query(models.ScrapeJob).count() == 1
+
+
+def test_periodic_enqueue_skips_recent_job(db):
+    job, _ = enqueue_scrape_job(db, SITES)
+    job.status = "completed"
+    db.commit()
+
+    assert enqueue_scrape_job(db, newer_than=datetime.utcnow() - timedelta(minutes=5)) == (None, True)
+    _, coalesced = enqueue_scrape_job(db, SITES)
+    assert not coalesced
+
+
+def test_stale_heartbeat_is_reclaimed(db):
+    job, _ = enqueue_scrape_job(db, ["dmo"])
+    crashed, survivor = ScrapeWorker("crashed"), ScrapeWorker("survivor")
+    task = crashed._claim(db)
+    assert task.worker_id == "crashed"
+
+    # Heartbeat'i taze olan görev başka worker'a geçmez
+    survivor._release_expired(db)
+    assert survivor._claim(db) is None
+
+    _expire_lease(db, task.id)
+    survivor._release_expired(db)
+    assert (_tasks(db, job.id)["dmo"].status, _tasks(db, job.id)["dmo"].worker_id) == ("pending", None)
+
+    reclaimed = survivor._claim(db)
+    assert (reclaimed.id, reclaimed.worker_id, reclaimed.attempts) == (task.id, "survivor", 2)
+
+    # Düşen worker geri gelse de sonucu yazamaz
+    crashed._finish_task(task, 5, None)
+    assert crashed.lost == 1
+    assert _tasks(db, job.id)["dmo"].status == "running"
+
+
+def test_exhausted_lease_fails_task_and_job(db):
+    job, _ = enqueue_scrape_job(db, ["dmo"])
+    worker = ScrapeWorker("w")
+    task = worker._claim(db)
+    db.execute(
+        update(models.ScrapeTask)
+        .where(models.ScrapeTask.id == task.id)
+        .values(attempts=settings.SCRAPE_TASK_MAX_ATTEMPTS)
+    )
+    _expire_lease(db, task.id)
+
+    worker._release_expired(db)
+
+    assert _tasks(db, job.id)["dmo"].status == "failed"
+    assert db.get(models.ScrapeJob, job.id).status == "failed"
+
+
+@pytest.mark.parametrize("errors, status, inserted, error", [
+    ({}, "completed", 7, None),
+    ({"dmo": "zaman aşımı"}, "completed", 4, None),
+    ({"dmo": "zaman aşımı", "turksat": "403"}, "failed", 0, "Tüm kaynaklar başarısız oldu"),
+])
+def test_finish_job_transitions(db, errors, status, inserted, error):
+    job, _ = enqueue_scrape_job(db, SITES)
+    worker = ScrapeWorker("w")
+    counts = {"dmo": 3, "turksat": 4}
+
+    first = worker._claim(db)
+    assert db.get(models.ScrapeJob, job.id).status == "running"
+    worker._finish_task(first, 0 if first.slug in errors else counts[first.slug], errors.get(first.slug))
+    db.expire_all()
+    # Bitmemiş görev varken iş açık kalır
+    assert db.get(models.ScrapeJob, job.id).status == "running"
+
+    second = worker._claim(db)
+    worker._finish_task(second, 0 if second.slug in errors else counts[second.slug], errors.get(second.slug))
+    db.expire_all()
+    closed = db.get(models.ScrapeJob, job.id)
+    assert (closed.status, closed.inserted, closed.error) == (status, inserted, error)
+    assert closed.finished_at is not None
@@ -0,0 +1,18 @@
+from datetime import datetime, timedelta
+
+from app import crud
+
+
+def test_by_day_covers_calendar_days_not_rows(db):
+    source = crud.ensure_source(db, "Kaynak", "https://k.example", "kaynak")
+    today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    # Aradaki boş günler pencereyi geriye uzatmamalı
+    for i, age in enumerate([0, 2, 6, 7, 40]):
+        crud.create_tender_if_new(db, source, f"İhale {i}", f"https://k/{i}", published_at=today - timedelta(days=age))
+
+    stats = crud.get_tender_stats(db, 7)
+
+    assert [row["day"] for row in stats["by_day"]] == [
+        (today - timedelta(days=age)).date().isoformat() for age in (6, 2, 0)
+    ]
+    assert stats["total"] == 5